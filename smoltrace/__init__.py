@@ -4,9 +4,20 @@ SMOLTRACE - Comprehensive benchmarking and evaluation framework for smolagents.
 
 __version__ = "0.1.1"
 
-# Export main functions
-from .core import run_evaluation
-from .utils import cleanup_datasets, discover_smoltrace_datasets, filter_runs, group_datasets_by_run
+# Export main functions. They are resolved lazily so that importing a lightweight
+# submodule (e.g. smoltrace.otel) does not pull in datasets/smolagents up front.
+_LAZY_EXPORTS = {
+    "run_evaluation": ".core",
+    "cleanup_datasets": ".utils",
+    "discover_smoltrace_datasets": ".utils",
+    "filter_runs": ".utils",
+    "group_datasets_by_run": ".utils",
+    "WeatherTool": ".tools",
+    "CalculatorTool": ".tools",
+    "TimeTool": ".tools",
+    "get_all_tools": ".tools",
+    "initialize_mcp_tools": ".tools",
+}
 
 __all__ = [
     "run_evaluation",
@@ -14,5 +25,20 @@ __all__ = [
     "discover_smoltrace_datasets",
     "group_datasets_by_run",
     "filter_runs",
+    "WeatherTool",
+    "CalculatorTool",
+    "TimeTool",
+    "get_all_tools",
+    "initialize_mcp_tools",
     "exporters",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,6 +3,7 @@
 
 import argparse
 import json
+import math
 
 from dotenv import load_dotenv
 
@@ -70,6 +71,21 @@ def parse_model_args(model_args_list):
     return parsed
 
 
+def parse_positive_float(value):
+    """Parse a finite float greater than 0 for argparse ``type=``.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a number or is not > 0
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value!r}")
+    return number
+
+
 def main():
     """Main entry point for the smoltrace CLI."""
     parser = argparse.ArgumentParser(
@@ -314,10 +330,25 @@ def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
     parser.add_argument(
         "--parallel-workers",
+        "--concurrency",
+        dest="parallel_workers",
         type=int,
         default=1,
         help="Number of parallel workers for evaluation (default: 1, recommended: 8 for API models)",
     )
+    parser.add_argument(
+        "--rate-limit",
+        type=parse_positive_float,
+        default=None,
+        help="Maximum number of tests started per second across all workers (default: unlimited). "
+        "Useful to stay under provider rate limits with --parallel-workers.",
+    )
+    parser.add_argument(
+        "--dedupe-prompts",
+        action="store_true",
+        help="Run test cases that repeat another case's prompt and expectations only once per "
+        "agent type and reuse the result for the duplicates",
+    )
     parser.add_argument(
         "--working-directory",
         type=str,
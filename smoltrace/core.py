@@ -3,12 +3,14 @@
 
 import gc
 import json
+import operator
 import os
 import re
 import threading
+import time
 import uuid
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
@@ -19,7 +21,7 @@ from opentelemetry import trace
 from smolagents import CodeAgent, LiteLLMModel, ToolCallingAgent
 from smolagents.memory import ActionStep, FinalAnswerStep, PlanningStep
 
-from .otel import setup_inmemory_otel
+from .otel import TEST_SPAN_NAME, setup_inmemory_otel
 from .tools import get_all_tools, initialize_mcp_tools
 
 # Suppress common transformers warnings that don't affect functionality
@@ -28,6 +30,13 @@ warnings.filterwarnings(
     "ignore", message=".*attention mask is not set.*", category=UserWarning, module="transformers.*"
 )
 
+_FINAL_ANSWER_CALL_RE = re.compile(r"\bfinal_answer\s*\(")
+
+
+def _span_include_prompt() -> bool:
+    """Whether test spans should carry a prompt excerpt (opt-in, off by default)."""
+    return os.getenv("SMOLTRACE_SPAN_INCLUDE_PROMPT", "").strip().lower() in {"1", "true", "yes"}
+
 
 def _cleanup_gpu_memory(verbose: bool = False):
     """Frees GPU memory between test iterations to prevent OOM.
@@ -52,6 +61,52 @@ def _cleanup_gpu_memory(verbose: bool = False):
         pass
 
 
+def _run_in_background(fn, *args, **kwargs) -> Future:
+    """Runs ``fn`` on a daemon thread and returns a Future for its result.
+
+    A daemon thread (rather than an executor) never blocks interpreter exit if
+    the caller bails out before collecting the result.
+    """
+    future = Future()
+
+    def runner():
+        if not future.set_running_or_notify_cancel():
+            return
+        # BaseException too (e.g. SystemExit from a library): otherwise the thread dies
+        # with the Future still RUNNING and future.result() blocks forever
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:  # noqa: BLE001 - re-raised by future.result()
+            future.set_exception(exc)
+
+    threading.Thread(target=runner, name="smoltrace-background", daemon=True).start()
+    return future
+
+
+class _RateLimiter:
+    """Spaces out test starts so at most ``rate`` tests begin per second.
+
+    Shared by every worker thread of a run, so the limit holds across
+    ``parallel_workers`` and across agent types.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate_limit must be greater than 0")
+        self._interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
 # --- Default Test Cases ---
 DEFAULT_TOOL_TESTS = [
     {
@@ -120,6 +175,24 @@ def load_test_cases_from_hf(
         ) from e
 
 
+def _collect_test_cases(test_cases_future: Future, allow_fallback: bool) -> List[Dict]:
+    """Wait for a background ``load_test_cases_from_hf`` call (made without fallback).
+
+    Applies the developer fallback here, on the caller's thread, so its warning
+    doesn't interleave with output printed while the load was running.
+    """
+    try:
+        return test_cases_future.result()
+    except RuntimeError as e:
+        if not allow_fallback:
+            raise
+        print(
+            f"[WARNING] Error loading dataset: {e.__cause__ or e}. "
+            "Using explicit developer fallback."
+        )
+        return DEFAULT_TOOL_TESTS + DEFAULT_CODE_TESTS
+
+
 def _initialize_model(
     model_name: str,
     provider: str,
@@ -265,6 +338,11 @@ def initialize_agent(
         if "verbosity_level" in prompt_config:
             kwargs["verbosity_level"] = prompt_config["verbosity_level"]
 
+        # ToolCallingAgent-specific parameters. smolagents already runs the tool
+        # calls of a single step concurrently; this caps that thread pool.
+        if agent_type == "tool" and "max_tool_threads" in prompt_config:
+            kwargs["max_tool_threads"] = prompt_config["max_tool_threads"]
+
         # CodeAgent-specific parameters
         if agent_type == "code":
             if "prompt_templates" in prompt_config:
@@ -390,12 +468,11 @@ def analyze_streamed_steps(
             steps_count += 1
 
             # Pass available_tools for dynamic MCP tool detection
-            tools_used.extend(
-                extract_tools_from_action_step(event, agent_type, debug, tracer, available_tools)
+            step_tools, step_final_answer = scan_action_step(
+                event, agent_type, debug, tracer, available_tools
             )
-
-            if is_final_answer_called_in_action_step(event, agent_type):
-                final_answer_called = True
+            tools_used.extend(step_tools)
+            final_answer_called = final_answer_called or step_final_answer
 
         elif isinstance(event, FinalAnswerStep):
             final_answer_called = True
@@ -409,10 +486,10 @@ def analyze_streamed_steps(
     return tools_used, final_answer_called, steps_count, response
 
 
-def extract_tools_from_action_step(
+def scan_action_step(
     event: ActionStep, agent_type: str, debug: bool, tracer, available_tools: Optional[list] = None
-) -> list:
-    """Extracts tools used from an ActionStep event.
+) -> tuple[list, bool]:
+    """Extracts tools used and final_answer detection from an ActionStep in one pass.
 
     Args:
         event: The ActionStep event to analyze
@@ -422,49 +499,70 @@ def extract_tools_from_action_step(
         available_tools: Optional list of available tool objects for dynamic extraction
 
     Returns:
-        List of tool names used in this action step
+        Tuple of (tool names used in this action step, whether final_answer was called)
     """
 
     tools = []
+    final_answer_called = False
+
+    tool_calls = getattr(event, "tool_calls", None) or ()
+    current_span = trace.get_current_span() if tracer and tool_calls else None
+    if current_span is not None and not current_span.is_recording():
+        current_span = None
 
-    if hasattr(event, "tool_calls") and event.tool_calls:
-        for tool_call in event.tool_calls:
-            if hasattr(tool_call, "name"):
-                tool_name = tool_call.name
+    for tool_call in tool_calls:
+        tool_name = getattr(tool_call, "name", None)
+        if tool_name is None:
+            continue
 
-                if debug:
-                    print(f"[DEBUG] Tool call: {tool_name}")
+        if debug:
+            print(f"[DEBUG] Tool call: {tool_name}")
 
-                if tracer:
-                    current_span = trace.get_current_span()
-                    if current_span and current_span.is_recording():
-                        current_span.add_event("tool_call", attributes={"name": tool_name})
+        if current_span is not None:
+            current_span.add_event("tool_call", attributes={"name": tool_name})
 
-                if tool_name != "final_answer":
-                    tools.append(tool_name)
+        if tool_name == "final_answer":
+            final_answer_called = True
+        else:
+            tools.append(tool_name)
 
-    if agent_type == "code" and hasattr(event, "code") and event.code:
+    code = getattr(event, "code", None) if agent_type == "code" else None
+    if code:
         # Pass available_tools to enable dynamic MCP tool detection
-        code_tools = extract_tools_from_code(event.code, available_tools=available_tools)
+        tools.extend(extract_tools_from_code(code, available_tools=available_tools))
+        if not final_answer_called and _FINAL_ANSWER_CALL_RE.search(code):
+            final_answer_called = True
 
-        tools.extend(code_tools)
+    return tools, final_answer_called
 
-    return tools
+
+def extract_tools_from_action_step(
+    event: ActionStep, agent_type: str, debug: bool, tracer, available_tools: Optional[list] = None
+) -> list:
+    """Extracts tools used from an ActionStep event.
+
+    Args:
+        event: The ActionStep event to analyze
+        agent_type: Type of agent ("tool" or "code")
+        debug: Whether to print debug information
+        tracer: OpenTelemetry tracer for instrumentation
+        available_tools: Optional list of available tool objects for dynamic extraction
+
+    Returns:
+        List of tool names used in this action step
+    """
+    return scan_action_step(event, agent_type, debug, tracer, available_tools)[0]
 
 
 def is_final_answer_called_in_action_step(event: ActionStep, agent_type: str) -> bool:
     """Checks if the final_answer tool was called within an ActionStep event."""
 
-    if hasattr(event, "tool_calls") and event.tool_calls:
-        for tool_call in event.tool_calls:
-            if hasattr(tool_call, "name") and tool_call.name == "final_answer":
-                return True
-
-    if agent_type == "code" and hasattr(event, "code") and event.code:
-        if re.search(r"\bfinal_answer\s*\(", event.code):
+    for tool_call in getattr(event, "tool_calls", None) or ():
+        if getattr(tool_call, "name", None) == "final_answer":
             return True
 
-    return False
+    code = getattr(event, "code", None) if agent_type == "code" else None
+    return bool(code and _FINAL_ANSWER_CALL_RE.search(code))
 
 
 def build_test_case_uid(agent_type: str, test_id: str) -> str:
@@ -478,6 +576,39 @@ def build_test_case_uid(agent_type: str, test_id: str) -> str:
     return f"{agent_type}:{test_id}"
 
 
+# Fields that identify or categorize a test case without changing what the agent is asked
+_TEST_IDENTITY_FIELDS = frozenset({"id", "difficulty", "agent_type"})
+
+
+def _duplicate_test_key(test_case: Dict) -> str:
+    """Builds a key shared by test cases that ask the same thing with the same expectations.
+
+    The prompt is whitespace-normalized and every other field except the test's
+    identity (id, difficulty split, agent type) must match exactly, so two cases
+    only share a key when re-running one would re-check the same expectations.
+    """
+    fields = {k: v for k, v in test_case.items() if k not in _TEST_IDENTITY_FIELDS}
+    fields["prompt"] = " ".join(str(test_case.get("prompt", "")).split())
+    return json.dumps(fields, sort_keys=True, default=str)
+
+
+def _reuse_result(result: Dict, test_case: Dict, agent_type: str) -> Dict:
+    """Copies a finished result onto a duplicate test case, marking where it came from.
+
+    The copy carries no trace/span ids of its own: no span was recorded for the
+    duplicate, and ``reused_from`` points at the result that was.
+    """
+    reused = dict(result, tools_used=list(result.get("tools_used") or []))
+    reused["trace_id"] = None
+    reused["span_id"] = None
+    reused["test_id"] = test_case["id"]
+    reused["test_case_uid"] = build_test_case_uid(agent_type, test_case["id"])
+    reused["difficulty"] = test_case["difficulty"]
+    reused["prompt"] = test_case["prompt"]
+    reused["reused_from"] = result["test_case_uid"]
+    return reused
+
+
 def span_identifiers(span) -> Dict[str, Optional[str]]:
     """Reads ``trace_id``/``span_id`` off a live span in the exporter's format.
 
@@ -541,12 +672,13 @@ def evaluate_single_test(
             "test.case_uid": test_case_uid,
             "test.difficulty": test_case["difficulty"],
             "agent.type": agent_type,
-            "prompt": test_case["prompt"][:100],
         }
+        # The prompt is already stored on the result row; copying it onto every
+        # exported span only inflates trace size, so it is opt-in.
+        if _span_include_prompt():
+            span_attributes["prompt"] = test_case["prompt"][:100]
         if tracer:
-            with tracer.start_as_current_span(
-                "test_evaluation", attributes=span_attributes
-            ) as span:
+            with tracer.start_as_current_span(TEST_SPAN_NAME, attributes=span_attributes) as span:
                 # Record the trace context BEFORE running the agent: an agent
                 # failure must not cost us the trace link.
                 result.update(span_identifiers(span))
@@ -646,6 +778,8 @@ def run_evaluation(
     allow_test_fallback: bool = False,
     trust_remote_code: bool = False,
     dataset_revision: Optional[str] = None,
+    rate_limit: Optional[float] = None,
+    dedupe_prompts: bool = False,
 ):
     """Runs the evaluation for specified agent types and test subsets, collecting traces and metrics.
 
@@ -671,16 +805,22 @@ def run_evaluation(
         working_directory: Working directory for file tools
         model_args: Additional model generation parameters (temperature, top_p, etc.)
         mcp_transport: MCP transport override ("auto", "streamable-http", or "sse")
+        rate_limit: Optional cap on test starts per second, shared across workers
+        dedupe_prompts: Run test cases that repeat another case's prompt and expectations
+            only once per agent type and reuse that result (marked with ``reused_from``)
 
     Returns:
         tuple: (all_results, trace_data, metric_data, dataset_name, run_id)
     """
 
-    test_cases = load_test_cases_from_hf(
-        dataset_name,
-        split,
-        allow_fallback=allow_test_fallback,
-        revision=dataset_revision,
+    # Rejects a non-positive rate before any background work or OTEL setup starts
+    rate_limiter = _RateLimiter(rate_limit) if rate_limit is not None else None
+
+    # Load test cases in the background so the download overlaps OTEL setup. The
+    # fallback (and its warning) is applied on this thread once the load is collected,
+    # so the background thread prints nothing into the setup output
+    test_cases_future = _run_in_background(
+        load_test_cases_from_hf, dataset_name, split, revision=dataset_revision
     )
 
     run_id = run_id or str(uuid.uuid4())
@@ -706,6 +846,10 @@ def run_evaluation(
         print("[WARNING] Parallel workers are disabled when MCP servers are configured")
         effective_workers = 1
 
+    # Collect the test cases before any model is loaded, so a bad dataset name or a
+    # missing token fails before (potentially multi-GB) model setup
+    test_cases = _collect_test_cases(test_cases_future, allow_test_fallback)
+
     shared_model = None
     if effective_workers == 1:
         shared_model = _initialize_model(
@@ -738,6 +882,8 @@ def run_evaluation(
             parallel_workers=effective_workers,
             model_instance=shared_model,
             trust_remote_code=trust_remote_code,
+            rate_limiter=rate_limiter,
+            dedupe_prompts=dedupe_prompts,
         )
 
     if verbose:
@@ -762,7 +908,7 @@ def run_evaluation(
 
     # Extract metrics: both GPU time-series and trace aggregates
     metric_data = extract_metrics(
-        metric_exporter, trace_aggregator, trace_data, all_results, run_id
+        metric_exporter, trace_aggregator, trace_data, all_results, run_id, debug=debug
     )
 
     # Enhance results with trace info and run_id
@@ -785,7 +931,10 @@ def run_evaluation(
                     test_case_uid=result.get("test_case_uid"),
                 )
                 # The source-captured ids win; fall back to the reconstructed
-                # summary only when the span context was never available.
+                # summary only when the span context was never available. Reused
+                # results have no span of their own, so they keep empty ids.
+                if "reused_from" in result:
+                    continue
                 if not result.get("trace_id"):
                     result["trace_id"] = result["enhanced_trace_info"].get("trace_id")
                 if not result.get("span_id"):
@@ -816,10 +965,24 @@ def _run_agent_tests(
     parallel_workers: int = 1,
     model_instance=None,
     trust_remote_code: bool = False,
+    rate_limiter: Optional[_RateLimiter] = None,
+    dedupe_prompts: bool = False,
 ) -> List[Dict]:
     """Helper function to run tests for a single agent type and return results."""
 
-    valid_tests = _filter_tests(test_cases, agent_type, test_subset)
+    all_tests = _filter_tests(test_cases, agent_type, test_subset)
+    valid_tests = all_tests
+    if dedupe_prompts:
+        test_keys = [_duplicate_test_key(tc) for tc in all_tests]
+        first_by_key = {}
+        for key, tc in zip(test_keys, all_tests):
+            first_by_key.setdefault(key, tc)
+        valid_tests = list(first_by_key.values())
+        if len(valid_tests) < len(all_tests):
+            print(
+                f"[OK] Reusing results for {len(all_tests) - len(valid_tests)} duplicate "
+                f"{agent_type} test case(s)"
+            )
     if parallel_workers > 1 and valid_tests:
         worker_state = threading.local()
 
@@ -839,6 +1002,8 @@ def _run_agent_tests(
                     mcp_transport=mcp_transport,
                     trust_remote_code=trust_remote_code,
                 )
+            if rate_limiter:
+                rate_limiter.wait()
             return evaluate_single_test(
                 worker_state.agent,
                 test_case.copy(),
@@ -870,6 +1035,8 @@ def _run_agent_tests(
         )
         results = []
         for test_number, tc in enumerate(valid_tests, start=1):
+            if rate_limiter:
+                rate_limiter.wait()
             results.append(
                 evaluate_single_test(
                     agent, tc.copy(), agent_type, tracer, None, verbose, debug, model_args
@@ -880,6 +1047,17 @@ def _run_agent_tests(
         if gpu_provider and valid_tests and len(valid_tests) % 10:
             _cleanup_gpu_memory(verbose=debug)
 
+    if len(valid_tests) < len(all_tests):
+        result_by_key = dict(zip(first_by_key, results))
+        expanded = []
+        for key, tc in zip(test_keys, all_tests):
+            result = result_by_key[key]
+            # Compared by identity: a repeated case with the same id still gets its own copy
+            expanded.append(
+                result if tc is first_by_key[key] else _reuse_result(result, tc, agent_type)
+            )
+        results = expanded
+
     if verbose:
         print_agent_summary(agent_type, results)
 
@@ -899,12 +1077,20 @@ def _filter_tests(
     return filtered_tests
 
 
+_get_success = operator.itemgetter("success")
+
+
+def count_successes(results: List[Dict]) -> int:
+    """Counts successful results with a C-level map/sum instead of a generator loop."""
+    return sum(map(_get_success, results))
+
+
 def print_agent_summary(agent_type: str, results: list):
     """Prints a summary of the evaluation results for a specific agent type."""
     total = len(results)
     if total == 0:
         return
-    successful = sum(1 for r in results if r["success"])
+    successful = count_successes(results)
     print(f"\n--- {agent_type.upper()} SUMMARY ---")
     print(f"Total: {total}, Success: {successful}/{total} ({successful / total * 100:.1f}%)")
 
@@ -917,7 +1103,7 @@ def print_combined_summary(all_results: dict):
     for agent_type, results in all_results.items():
         if results:
             total = len(results)
-            successful = sum(1 for r in results if r["success"])
+            successful = count_successes(results)
             print(f"{agent_type.upper()}: {successful}/{total} ({successful / total * 100:.1f}%)")
 
 
@@ -1035,7 +1221,12 @@ def extract_traces(span_exporter, run_id: str) -> List[Dict]:
 
 
 def extract_metrics(
-    metric_exporter, trace_aggregator, trace_data: List[Dict], all_results: Dict, run_id: str
+    metric_exporter,
+    trace_aggregator,
+    trace_data: List[Dict],
+    all_results: Dict,
+    run_id: str,
+    debug: bool = False,
 ) -> Dict:
     """Extract metrics from both GPU time-series and trace aggregates.
 
@@ -1045,6 +1236,7 @@ def extract_metrics(
         trace_data: List of trace dictionaries
         all_results: Dict of results by agent type
         run_id: Unique run identifier
+        debug: Whether to print full tracebacks when trace aggregation fails
 
     Returns:
         Dict containing:
@@ -1079,7 +1271,7 @@ def extract_metrics(
     # Get trace-based aggregates from trace_aggregator
     if trace_aggregator:
         try:
-            trace_metrics = trace_aggregator.collect_all(trace_data, all_results)
+            trace_metrics = trace_aggregator.collect_all(trace_data, all_results, debug=debug)
             metrics_dict["aggregates"] = trace_metrics
             print(f"[Metrics] Aggregated {len(trace_metrics)} trace metrics")
         except Exception as e:
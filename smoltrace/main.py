@@ -186,6 +186,8 @@ def run_evaluation_flow(args):
         search_provider=getattr(args, "search_provider", "duckduckgo"),
         hf_inference_provider=getattr(args, "hf_inference_provider", None),
         parallel_workers=getattr(args, "parallel_workers", 1),
+        rate_limit=getattr(args, "rate_limit", None),
+        dedupe_prompts=getattr(args, "dedupe_prompts", False),
         enabled_smolagents_tools=getattr(args, "enable_tools", None),
         working_directory=getattr(args, "working_directory", None),
         model_args=getattr(args, "model_args_dict", None),
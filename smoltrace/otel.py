@@ -1,8 +1,10 @@
 # smoltrace/otel.py
 
+import json
 import logging
 import os
 import re
+import tempfile
 import threading
 import uuid
 from typing import Dict, List
@@ -17,7 +19,13 @@ from opentelemetry.sdk.metrics.export import (
 )
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+# Optional: orjson for faster span spooling (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the "fast" extra
+    orjson = None
 
 # Smolagents (assume installed)
 
@@ -73,6 +81,50 @@ def _safe_attrs_to_dict(attrs):
         return {}
 
 
+def _dumps_span(span_dict: Dict) -> bytes:
+    """Serialize a span dict to compact JSON bytes, preferring orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(span_dict, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(span_dict, default=str).encode("utf-8")
+
+
+def _loads_span(line: bytes) -> Dict:
+    """Parse a spooled span line, accepting anything ``_dumps_span`` can write."""
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # Lines from the stdlib fallback may hold NaN/Infinity, which orjson rejects
+            pass
+    return json.loads(line)
+
+
+# Name of the root span core.evaluate_single_test opens for each test case
+TEST_SPAN_NAME = "test_evaluation"
+
+# Span status codes: 0=UNSET, 1=OK, 2=ERROR
+_STATUS_CODE_NAMES = {0: "UNSET", 1: "OK", 2: "ERROR"}
+
+
+def _spool_spans_enabled() -> bool:
+    """Whether finished spans should be spooled to a temp file (opt-in, off by default)."""
+    return os.getenv("SMOLTRACE_SPOOL_SPANS", "").strip().lower() in {"1", "true", "yes"}
+
+
+def _coerce_int(value) -> int:
+    """Convert a span attribute to int, treating missing or unparsable values as 0."""
+    # Attributes are exported type-preserving, so native ints skip the parse
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
 # Optional: Your genai_otel_instrument
 try:
     import genai_otel
@@ -87,47 +139,140 @@ except ImportError:
 # ============================================================================
 
 
+class _CountingBatchSpanProcessor(BatchSpanProcessor):
+    """BatchSpanProcessor that counts the spans it queues for export.
+
+    The batch queue is bounded and silently drops spans once full; comparing this
+    count with what the exporter received is how dropped spans are detected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queued_lock = threading.Lock()
+        self.queued_spans = 0
+
+    def on_end(self, span):
+        if span.context and span.context.trace_flags.sampled:
+            with self._queued_lock:
+                self.queued_spans += 1
+        super().on_end(span)
+
+
 class InMemorySpanExporter(SpanExporter):
-    def __init__(self):
+    def __init__(self, spool_to_disk: bool = False):
         self._spans = []
+        self._exported_count = 0
+        self._reported_drops = 0
+        # Optional JSONL spool: span dicts are written to a temp file instead of being
+        # kept alive for the whole run, and only read back when traces are extracted.
+        # Held open for the exporter's lifetime on purpose; shutdown() closes it.
+        self._spool = (
+            tempfile.TemporaryFile(mode="w+b")  # noqa: SIM115 - closed in shutdown()
+            if spool_to_disk
+            else None
+        )
+        self._spool_lock = threading.Lock()
+        self._processor = None
+        self._resource_cache = None
+
+    def attach_processor(self, processor):
+        """Register the span processor feeding this exporter so reads can flush it first."""
+        self._processor = processor
 
     def export(self, spans):
-        for span in spans:
-            span_dict = self._to_dict(span)
-            self._spans.append(span_dict)
+        with self._spool_lock:
+            self._exported_count += len(spans)
+        if self._spool is None:
+            # Conversion is pure Python and GIL-bound, so a batch is mapped on the batch
+            # processor's worker thread rather than fanned out to a thread pool
+            self._spans.extend(map(self._to_dict, spans))
+            return SpanExportResult.SUCCESS
+
+        if not spans:
+            return SpanExportResult.SUCCESS
+        payload = b"\n".join(map(_dumps_span, map(self._to_dict, spans))) + b"\n"
+        with self._spool_lock:
+            self._spool.seek(0, os.SEEK_END)
+            self._spool.write(payload)
         return SpanExportResult.SUCCESS
 
     def shutdown(self):
-        pass
+        # Spooled spans are moved back into memory before the temp file is closed,
+        # so get_finished_spans() still returns them after shutdown
+        if self._spool is not None:
+            with self._spool_lock:
+                self._spans.extend(self._read_spool())
+                self._spool.close()
+                self._spool = None
 
     def get_finished_spans(self):
-        return self._spans
+        # Spans may still be queued in a batching processor; drain them before reading
+        if self._processor is not None:
+            if not self._processor.force_flush():
+                logging.getLogger(__name__).warning(
+                    "Span processor did not finish flushing; trace data may be incomplete"
+                )
+            self._report_dropped_spans()
+        if self._spool is None:
+            return self._spans
+        with self._spool_lock:
+            # Re-checked under the lock: shutdown() may have closed the spool meanwhile
+            return self._spans if self._spool is None else self._read_spool()
+
+    def _read_spool(self):
+        self._spool.flush()
+        self._spool.seek(0)
+        return [_loads_span(line) for line in self._spool]
+
+    def _report_dropped_spans(self):
+        queued = getattr(self._processor, "queued_spans", None)
+        if queued is None:
+            return
+        dropped = queued - self._exported_count
+        if dropped > self._reported_drops:
+            logging.getLogger(__name__).warning(
+                "%d span(s) were dropped because the export queue was full; "
+                "trace data is incomplete",
+                dropped,
+            )
+            self._reported_drops = dropped
+
+    def _resource_attrs(self, resource):
+        # Every span from one TracerProvider carries the same immutable Resource, so its
+        # attributes are converted once and the dict is shared by the exported spans
+        cached = self._resource_cache
+        if cached is None or cached[0] is not resource:
+            cached = self._resource_cache = (resource, _safe_attrs_to_dict(resource.attributes))
+        return cached[1]
+
+    def _to_dict(self, span, _hex=hex, _str=str):
+        # Attributes are materialized exactly once; enrichment reads the local dict.
+        # hex/str are bound as defaults so the per-span calls are local lookups.
+        attrs = _safe_attrs_to_dict(span.attributes)
+        context = span.get_span_context()
+        parent = span.parent
+        status = span.status
+        start_time = span.start_time
+        end_time = span.end_time
+        resource = span.resource
 
-    def _to_dict(self, span):
         # Map status code from numeric to string for UI compatibility
         status_code = None
-        if hasattr(span.status, "status_code"):
-            code_value = span.status.status_code.value
-            # Map: 0=UNSET, 1=OK, 2=ERROR
-            status_map = {0: "UNSET", 1: "OK", 2: "ERROR"}
-            status_code = status_map.get(code_value, "UNKNOWN")
+        if hasattr(status, "status_code"):
+            status_code = _STATUS_CODE_NAMES.get(status.status_code.value, "UNKNOWN")
 
         # Clean up span kind - remove "SpanKind." prefix
-        kind_str = str(span.kind)
-        if kind_str.startswith("SpanKind."):
-            kind_str = kind_str.replace("SpanKind.", "")
+        kind_str = _str(span.kind).removeprefix("SpanKind.")
 
         d = {
-            "trace_id": hex(span.get_span_context().trace_id),
-            "span_id": hex(span.get_span_context().span_id),
-            "parent_span_id": hex(span.parent.span_id) if span.parent else None,
+            "trace_id": _hex(context.trace_id),
+            "span_id": _hex(context.span_id),
+            "parent_span_id": _hex(parent.span_id) if parent else None,
             "name": span.name,
-            "start_time": span.start_time,
-            "end_time": span.end_time,
-            "duration_ms": (
-                (span.end_time - span.start_time) / 1e6 if span.end_time and span.start_time else 0
-            ),
-            "attributes": _safe_attrs_to_dict(span.attributes),
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration_ms": (end_time - start_time) / 1e6 if end_time and start_time else 0,
+            "attributes": attrs,
             "events": [
                 {
                     "name": e.name,
@@ -138,19 +283,12 @@ class InMemorySpanExporter(SpanExporter):
             ],
             "status": {
                 "code": status_code,  # Use string code ("OK", "ERROR", "UNSET")
-                "description": (
-                    span.status.description if hasattr(span.status, "description") else None
-                ),
+                "description": getattr(status, "description", None),
             },
             "kind": kind_str,  # Cleaned kind without "SpanKind." prefix
-            "resource": (
-                {"attributes": _safe_attrs_to_dict(span.resource.attributes)}
-                if span.resource
-                else {}
-            ),
+            "resource": {"attributes": self._resource_attrs(resource)} if resource else {},
         }
         # Enrich with genai-specific (from traces)
-        attrs = d["attributes"]
         if "llm.token_count.total" in attrs:
             d["total_tokens"] = attrs["llm.token_count.total"]
         if "output.value" in attrs and "tool.name" in attrs:
@@ -346,7 +484,9 @@ class TraceMetricsAggregator:
     def __init__(self):
         self._metrics = []
 
-    def collect_all(self, trace_data: List[Dict] = None, all_results: List[Dict] = None):
+    def collect_all(
+        self, trace_data: List[Dict] = None, all_results: List[Dict] = None, debug: bool = False
+    ):
         try:
             if not trace_data:
                 print("No traces; returning empty")
@@ -359,58 +499,53 @@ class TraceMetricsAggregator:
             print(f"Collected {len(self._metrics)} metrics from traces")
         except Exception as e:
             print(f"Error aggregating from traces: {e}")
-            import traceback
+            if debug:
+                import traceback
 
-            traceback.print_exc()  # Show exact line
+                traceback.print_exc()  # Show exact line
+            else:
+                print("  (rerun with --debug for the full traceback)")
             self._metrics = []
         return self._metrics
 
-    def _aggregate_from_traces(self, trace_data: List[Dict], all_results: List[Dict]) -> List[Dict]:
-        # Create success lookup from results
-        success_map = {
+    def _get_success_map(self, all_results: Dict[str, List[Dict]]) -> Dict[str, bool]:
+        """Return the test_id -> success lookup for the current results.
+
+        Rebuilt on every call: results may be appended or have ``success`` updated in
+        place between aggregations, and checking for that costs as much as the rebuild.
+        """
+        return {
             r["test_id"]: r["success"]
             for results_list in all_results.values()
             for r in results_list
         }
 
-        # Aggregate from spans within traces
-        total_success = 0
-        total_tool_calls = 0
-        total_steps = 0
-        test_count = 0
-        total_tokens = 0
-        total_cost = 0.0
+    def _aggregate_from_traces(self, trace_data: List[Dict], all_results: List[Dict]) -> List[Dict]:
+        success_map = self._get_success_map(all_results)
+
+        # Aggregate trace-level token/cost totals
+        total_tokens = sum(int(t["total_tokens"]) for t in trace_data if t.get("total_tokens"))
+        total_cost = sum(
+            (float(t["total_cost_usd"]) for t in trace_data if t.get("total_cost_usd")), 0.0
+        )
 
+        # Fold all test evaluation spans into the counters in a single pass
+        is_successful = success_map.get
+        test_count = total_success = total_tool_calls = total_steps = 0
         for trace_item in trace_data:
-            # Use the aggregated trace-level metrics
-            if trace_item.get("total_tokens"):
-                total_tokens += int(trace_item["total_tokens"])
-            if trace_item.get("total_cost_usd"):
-                total_cost += float(trace_item["total_cost_usd"])
-
-            # Find test evaluation spans
-            for span in trace_item.get("spans", []):
-                attrs = span.get("attributes", {})
-
-                # Check if this is a test evaluation span
-                test_id = attrs.get("test.id")
-                if test_id:
-                    test_count += 1
-                    total_success += 1 if success_map.get(test_id, False) else 0
-
-                    # Get test-specific metrics from span attributes
-                    tool_calls = attrs.get("tests.tool_calls", "0")
-                    steps = attrs.get("tests.steps", "0")
-
-                    try:
-                        total_tool_calls += int(tool_calls)
-                    except (ValueError, TypeError):
-                        pass
-
-                    try:
-                        total_steps += int(steps)
-                    except (ValueError, TypeError):
-                        pass
+            for span in trace_item.get("spans", ()):
+                # Most spans are LLM/tool/internal spans; reject them on name alone
+                if span.get("name") != TEST_SPAN_NAME:
+                    continue
+                attrs = span.get("attributes")
+                test_id = attrs.get("test.id") if attrs else None
+                if not test_id:
+                    continue
+                test_count += 1
+                if is_successful(test_id, False):
+                    total_success += 1
+                total_tool_calls += _coerce_int(attrs.get("tests.tool_calls"))
+                total_steps += _coerce_int(attrs.get("tests.steps"))
 
         # CO2 estimate (based on tokens)
         co2_total = total_tokens / 1000 * 0.0004 if total_tokens > 0 else 0
@@ -607,10 +742,16 @@ def setup_inmemory_otel(
         except Exception as e:
             print(f"[WARNING] Could not add CostEnrichmentSpanProcessor: {e}")
 
-    # Then add our InMemorySpanExporter with SimpleSpanProcessor
-    # This exports spans AFTER cost has been added
-    span_exporter = InMemorySpanExporter()
-    trace_provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+    # Then add our InMemorySpanExporter with a BatchSpanProcessor
+    # This exports spans AFTER cost has been added, on a background thread so that
+    # span conversion does not run on the evaluation thread when each span ends
+    span_exporter = InMemorySpanExporter(spool_to_disk=_spool_spans_enabled())
+    # The queue is bounded; drops and incomplete flushes are reported by the exporter
+    span_processor = _CountingBatchSpanProcessor(
+        span_exporter, max_queue_size=8192, max_export_batch_size=512
+    )
+    span_exporter.attach_processor(span_processor)
+    trace_provider.add_span_processor(span_processor)
     trace.set_tracer_provider(trace_provider)
     tracer = trace.get_tracer(service_name)
 
@@ -2,16 +2,60 @@
 """Tool definitions for smoltrace agent evaluations."""
 
 import ast
+import fnmatch
+import heapq
+import io
 import ipaddress
 import operator
 import os
 import re
 import socket
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing
 from datetime import datetime
+from functools import lru_cache, partial, wraps
+from itertools import compress, filterfalse, islice, repeat, tee
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple, Union
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 from smolagents import Tool
+from smolagents.default_tools import (
+    DuckDuckGoSearchTool,
+    GoogleSearchTool,
+    PythonInterpreterTool,
+    UserInputTool,
+    VisitWebpageTool,
+    WikipediaSearchTool,
+)
+
+# Optional: Hyperscan for GrepTool's count-only scans (falls back to re)
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - exercised only without the "regex-accel" extra
+    hyperscan = None
+
+# Canned weather reports used by WeatherTool
+_WEATHER: Mapping[str, str] = MappingProxyType(
+    {
+        "Paris, France": "20°C, Partly Cloudy",
+        "London, UK": "15°C, Rainy",
+        "New York, USA": "25°C, Sunny",
+        "Tokyo, Japan": "18°C, Clear",
+        "Sydney, Australia": "22°C, Windy",
+    }
+)
+
+
+@lru_cache(maxsize=256)
+def _weather_lookup(location: str) -> str:
+    """Return the canned report for ``location``; fallback strings are built once per location."""
+    return _WEATHER.get(location, f"Weather data for {location}: 22°C, Clear")
 
 
 class WeatherTool(Tool):
@@ -27,14 +71,7 @@ class WeatherTool(Tool):
     output_type = "string"
 
     def forward(self, location: str) -> str:
-        weather_data = {
-            "Paris, France": "20°C, Partly Cloudy",
-            "London, UK": "15°C, Rainy",
-            "New York, USA": "25°C, Sunny",
-            "Tokyo, Japan": "18°C, Clear",
-            "Sydney, Australia": "22°C, Windy",
-        }
-        return weather_data.get(location, f"Weather data for {location}: 22°C, Clear")
+        return _weather_lookup(location)
 
 
 class CalculatorTool(Tool):
@@ -77,16 +114,43 @@ class CalculatorTool(Tool):
             return cls._UNARY_OPERATORS[type(node.op)](cls._evaluate_node(node.operand))
         raise ValueError("Only numeric literals and basic arithmetic operators are allowed")
 
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _calculate(cls, expression: str):
+        # Expressions are pure arithmetic, so repeated ones can reuse the evaluated value
+        return cls._evaluate_node(ast.parse(expression, mode="eval"))
+
     def forward(self, expression: str) -> str:
         try:
             if len(expression) > 256:
                 raise ValueError("Expression is too long")
-            result = self._evaluate_node(ast.parse(expression, mode="eval"))
+            result = self._calculate(expression)
             return f"Result: {result}"
         except Exception as e:
             return f"Error calculating: {str(e)}"
 
 
+# (epoch second, formatted local time) of the last TimeTool call; replaced as a
+# whole tuple so concurrent readers never see a mismatched pair
+_timestamp_cache: Tuple[int, str] = (-1, "")
+
+
+def _current_timestamp() -> str:
+    """Return the local time as ``%Y-%m-%d %H:%M:%S``, formatting at most once per second."""
+    global _timestamp_cache
+    second = int(time.time())
+    cached_second, timestamp = _timestamp_cache
+    if second != cached_second:
+        # Formatted by hand: equivalent to strftime("%Y-%m-%d %H:%M:%S") without its
+        # per-call format parsing
+        d = datetime.fromtimestamp(second)
+        timestamp = (
+            f"{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+        )
+        _timestamp_cache = (second, timestamp)
+    return timestamp
+
+
 class TimeTool(Tool):
     """Simple time tool for testing"""
 
@@ -102,7 +166,7 @@ class TimeTool(Tool):
     output_type = "string"
 
     def forward(self, timezone: str = "UTC") -> str:
-        return f"Current time in {timezone}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        return f"Current time in {timezone}: {_current_timestamp()}"
 
 
 # ============================================================================
@@ -110,7 +174,143 @@ class TimeTool(Tool):
 # ============================================================================
 
 
-class ReadFileTool(Tool):
+def _link_free_path_below(root: str, prefix: str, file_path: str) -> Optional[str]:
+    """Resolve ``file_path`` lexically if it lies below the already-resolved ``root``.
+
+    Only the components below ``root`` are lstat'ed, instead of realpath's lstat
+    of every component from ``/``. Returns None whenever lexical resolution could
+    differ from ``realpath`` (a ".." or a symlink on the way, or a path outside
+    ``root``), so the caller falls back to the full resolution. ``prefix`` is
+    ``root`` with exactly one trailing separator.
+    """
+    if ".." in file_path:
+        return None
+    path = os.path.normpath(os.path.join(root, file_path))
+    if path == root:
+        return path
+    if not path.startswith(prefix):
+        return None
+    current = root
+    for part in path[len(prefix) :].split(os.sep):
+        current = os.path.join(current, part)
+        try:
+            if stat.S_ISLNK(os.lstat(current).st_mode):
+                return None
+        except FileNotFoundError:
+            # Nothing below a missing component can be a link; realpath keeps the rest as is
+            break
+        except OSError:
+            return None
+    return path
+
+
+def _resolve_in_working_dir(working_dir: Path, root: str, prefix: str, file_path: str) -> Path:
+    """Resolve ``file_path`` against ``working_dir`` and ensure it stays inside it.
+
+    ``root`` is the resolved working directory as a string and ``prefix`` the same
+    with one trailing separator, both precomputed by the tool. Results are not
+    cached: a directory inside the sandbox can be swapped for a symlink pointing
+    out of it at any time, so every use re-checks the filesystem.
+    """
+    path = _link_free_path_below(root, prefix, file_path)
+    if path is not None:
+        return Path(path)
+
+    # Work on plain strings: os.path.join keeps absolute paths as they are, and
+    # realpath resolves symlinks and ".." without building PurePath part tuples
+    try:
+        path = os.path.realpath(os.path.join(working_dir, file_path))
+    except (OSError, RuntimeError) as e:
+        raise ValueError(f"Invalid path: {e}")
+
+    # Security check: Ensure path is within working_dir (prevent path traversal)
+    if path != root and not path.startswith(prefix):
+        raise ValueError(f"Access denied: Path {path} is outside working directory {working_dir}")
+
+    return Path(path)
+
+
+@lru_cache(maxsize=64)
+def _resolve_working_dir(working_dir: Path) -> Path:
+    """Resolve an absolute working directory once per process.
+
+    Benchmarks build many tools on the same directory; they all share this result.
+    """
+    return working_dir.resolve()
+
+
+class _WorkingDirMixin:
+    """Working-directory sandbox shared by the file system and text processing tools.
+
+    Only the working directory's own resolution is cached; every path is checked
+    against the filesystem again each time it is used.
+    """
+
+    def _init_working_dir(self, working_dir: Optional[str]) -> None:
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        # Resolved once: resolve() walks every path component with lstat/readlink.
+        # Relative directories depend on the current cwd, so only absolute ones are shared
+        if self.working_dir.is_absolute():
+            self._working_dir_resolved = _resolve_working_dir(self.working_dir)
+        else:
+            self._working_dir_resolved = self.working_dir.resolve()
+        # String forms for the containment check, so it is a plain startswith()
+        self._working_dir_root = os.fspath(self._working_dir_resolved)
+        self._working_dir_prefix = self._working_dir_root.rstrip(os.sep) + os.sep
+
+    def _validate_path(self, file_path: str) -> Path:
+        """Validate and resolve a path, rejecting anything outside the working directory."""
+        return _resolve_in_working_dir(
+            self.working_dir, self._working_dir_root, self._working_dir_prefix, file_path
+        )
+
+
+def _stat_regular_file(
+    path: Path, file_path: str
+) -> Tuple[Optional[os.stat_result], Optional[str]]:
+    """Check a tool's input file with one stat() call.
+
+    Returns ``(stat_result, None)`` for a regular file, otherwise ``(None, error)``
+    with the message the tool should return.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None, f"Error: File not found: {file_path}"
+    if not stat.S_ISREG(st.st_mode):
+        return None, f"Error: Path is not a file: {file_path}"
+    return st, None
+
+
+def _read_exact(path: Path, size: int) -> bytearray:
+    """Read up to ``size`` bytes of ``path`` into a single pre-allocated buffer."""
+    with open(path, "rb", buffering=0) as f:
+        return _readinto_exact(f, size)
+
+
+def _readinto_exact(f: BinaryIO, size: int) -> bytearray:
+    """Read up to ``size`` bytes from an unbuffered binary file into one pre-allocated buffer."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    offset = 0
+    while offset < size:
+        n = f.readinto(view[offset:])
+        if not n:
+            break
+        offset += n
+    view.release()
+    if offset < size:
+        # File shrank since it was stat'ed
+        del buf[offset:]
+    return buf
+
+
+# Readahead hint for ReadFileTool's whole-file reads (posix_fadvise is POSIX-only)
+_POSIX_FADV_SEQUENTIAL = getattr(os, "POSIX_FADV_SEQUENTIAL", None)
+_FADVISE_MIN_BYTES = 1024 * 1024  # below this the extra syscall isn't worth it
+
+
+class ReadFileTool(_WorkingDirMixin, Tool):
     """Read file contents with safety checks.
 
     Essential for GAIA benchmarks and SWE tasks that require reading source code,
@@ -139,33 +339,7 @@ class ReadFileTool(Tool):
     def __init__(self, working_dir: Optional[str] = None):
         """Initialize ReadFileTool with optional working directory."""
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, file_path: str) -> Path:
-        """Validate and resolve file path with security checks."""
-        # Convert to Path object
-        path = Path(file_path)
-
-        # If relative, make it relative to working_dir
-        if not path.is_absolute():
-            path = self.working_dir / path
-
-        # Resolve to absolute path (handles symlinks and ..)
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-
-        # Security check: Ensure path is within working_dir (prevent path traversal)
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-
-        return path
+        self._init_working_dir(working_dir)
 
     def forward(self, file_path: str, encoding: str = "utf-8") -> str:
         """Read file with safety checks."""
@@ -173,25 +347,48 @@ class ReadFileTool(Tool):
             # Validate path
             path = self._validate_path(file_path)
 
-            # Check if file exists
-            if not path.exists():
+            # Open first and fstat() the descriptor: existence, file type and size come
+            # from the file actually read, without a second path walk for stat().
+            # O_NONBLOCK keeps a FIFO from blocking the open; it's a no-op for regular files
+            try:
+                fd = os.open(
+                    path,
+                    os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_NONBLOCK", 0),
+                )
+            except FileNotFoundError:
                 return f"Error: File not found: {file_path}"
-
-            # Check if it's a file (not a directory)
-            if not path.is_file():
+            except IsADirectoryError:
                 return f"Error: Path is not a file: {file_path}"
 
-            # Check file size (limit to 10MB for safety)
-            file_size = path.stat().st_size
-            max_size = 10 * 1024 * 1024  # 10MB
-            if file_size > max_size:
-                return f"Error: File too large ({file_size} bytes). Maximum size: {max_size} bytes"
+            try:
+                st = os.fstat(fd)
+                if not stat.S_ISREG(st.st_mode):
+                    return f"Error: Path is not a file: {file_path}"
+
+                # Check file size (limit to 10MB for safety)
+                file_size = st.st_size
+                max_size = 10 * 1024 * 1024  # 10MB
+                if file_size > max_size:
+                    return (
+                        f"Error: File too large ({file_size} bytes). Maximum size: {max_size} bytes"
+                    )
+
+                if _POSIX_FADV_SEQUENTIAL is not None and file_size >= _FADVISE_MIN_BYTES:
+                    # Whole-file read: let the kernel use a larger readahead window
+                    os.posix_fadvise(fd, 0, 0, _POSIX_FADV_SEQUENTIAL)
 
-            # Read file
-            with open(path, "r", encoding=encoding) as f:
-                content = f.read()
+                # Read straight into a buffer sized from the fstat above
+                with open(fd, "rb", buffering=0, closefd=False) as f:
+                    data = _readinto_exact(f, file_size)
+            finally:
+                os.close(fd)
 
-            return f"File: {file_path}\nSize: {file_size} bytes\n\n{content}"
+            content = data.decode(encoding)
+            if "\r" in content:
+                # Keep the universal-newline behaviour of text-mode reads
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+            return "".join((f"File: {file_path}\nSize: {file_size} bytes\n\n", content))
 
         except UnicodeDecodeError as e:
             return f"Error: Failed to decode file with encoding '{encoding}': {e}"
@@ -203,7 +400,25 @@ class ReadFileTool(Tool):
             return f"Error reading file: {e}"
 
 
-class WriteFileTool(Tool):
+# System locations WriteFileTool refuses to write into, as one alternation
+_DANGEROUS_WRITE_PATHS = re.compile(
+    "|".join(
+        map(
+            re.escape,
+            (
+                "/etc/",
+                "/sys/",
+                "/proc/",
+                "/dev/",
+                "C:\\Windows\\",
+                "C:\\Program Files\\",
+            ),
+        )
+    )
+)
+
+
+class WriteFileTool(_WorkingDirMixin, Tool):
     """Write file contents with safety checks.
 
     Essential for SWE tasks that require creating configuration files,
@@ -236,52 +451,28 @@ class WriteFileTool(Tool):
     def __init__(self, working_dir: Optional[str] = None, allow_dangerous: bool = False):
         """Initialize WriteFileTool with optional working directory."""
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self._init_working_dir(working_dir)
         self.allow_dangerous = allow_dangerous
 
     def _validate_path(self, file_path: str) -> Path:
         """Validate and resolve file path with security checks."""
-        # Convert to Path object
         path = Path(file_path)
 
-        # If relative, make it relative to working_dir
-        if not path.is_absolute():
-            path = self.working_dir / path
-
-        # Resolve to absolute path
-        try:
-            # For new files, resolve parent directory
-            if not path.exists():
-                parent = path.parent.resolve()
-                path = parent / path.name
-            else:
-                path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-
-        # Security check: Ensure path is within working_dir
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
+        if path.name in ("", ".", ".."):
+            # Not a plain file name: resolve and check the whole path
+            path = super()._validate_path(file_path)
+        else:
+            # The target may not exist yet, so resolve (and contain) its parent instead of
+            # probing the target with exists() + resolve()
+            parent = super()._validate_path(str(path.parent))
+            path = parent / path.name
+            # An existing symlink would redirect the write; follow it and re-check
+            if os.path.islink(path):
+                path = super()._validate_path(str(path))
 
         # Security check: Prevent overwriting system files
-        dangerous_patterns = [
-            "/etc/",
-            "/sys/",
-            "/proc/",
-            "/dev/",
-            "C:\\Windows\\",
-            "C:\\Program Files\\",
-        ]
-        path_str = str(path)
-        if not self.allow_dangerous:
-            for pattern in dangerous_patterns:
-                if pattern in path_str:
-                    raise ValueError(f"Access denied: Cannot write to system directory: {path}")
+        if not self.allow_dangerous and _DANGEROUS_WRITE_PATHS.search(str(path)):
+            raise ValueError(f"Access denied: Cannot write to system directory: {path}")
 
         return path
 
@@ -299,14 +490,19 @@ class WriteFileTool(Tool):
             path.parent.mkdir(parents=True, exist_ok=True)
 
             # Determine file mode
-            file_mode = "a" if mode == "append" else "w"
+            file_mode = "ab" if mode == "append" else "wb"
 
-            # Write file
-            with open(path, file_mode, encoding="utf-8") as f:
-                f.write(content)
+            # Encode in one pass up front (same newline handling as text mode) instead of
+            # letting the text layer encode chunk by chunk
+            text = content.replace("\n", os.linesep) if os.linesep != "\n" else content
+            data = text.encode("utf-8")
 
-            # Get file info
-            file_size = path.stat().st_size
+            # Write file
+            with open(path, file_mode) as f:
+                f.write(data)
+                # The position after the write is the file size ("ab" opens at the end),
+                # so no stat() is needed to report it
+                file_size = f.tell()
 
             action = "Appended to" if mode == "append" else "Wrote"
             return f"{action} file: {file_path}\nSize: {file_size} bytes\nContent length: {len(content)} characters"
@@ -319,7 +515,7 @@ class WriteFileTool(Tool):
             return f"Error writing file: {e}"
 
 
-class ListDirectoryTool(Tool):
+class ListDirectoryTool(_WorkingDirMixin, Tool):
     """List files and directories with safety checks.
 
     Essential for exploring project structure, finding files in SWE/DevOps tasks.
@@ -347,32 +543,7 @@ class ListDirectoryTool(Tool):
     def __init__(self, working_dir: Optional[str] = None):
         """Initialize ListDirectoryTool with optional working directory."""
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, dir_path: str) -> Path:
-        """Validate and resolve directory path."""
-        path = Path(dir_path)
-
-        # If relative, make it relative to working_dir
-        if not path.is_absolute():
-            path = self.working_dir / path
-
-        # Resolve to absolute path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-
-        # Security check: Ensure path is within working_dir
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-
-        return path
+        self._init_working_dir(working_dir)
 
     def forward(self, directory_path: str, pattern: Optional[str] = None) -> str:
         """List directory contents with safety checks."""
@@ -381,20 +552,26 @@ class ListDirectoryTool(Tool):
             path = self._validate_path(directory_path)
 
             # Check if directory exists
-            if not path.exists():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return f"Error: Directory not found: {directory_path}"
 
             # Check if it's a directory
-            if not path.is_dir():
+            if not stat.S_ISDIR(st.st_mode):
                 return f"Error: Path is not a directory: {directory_path}"
 
             # List files
-            if pattern:
-                # Use glob pattern
+            if pattern and ("/" in pattern or os.sep in pattern or "**" in pattern):
+                # Multi-component patterns still need pathlib globbing
                 files = list(path.glob(pattern))
             else:
-                # List all files
-                files = list(path.iterdir())
+                # scandir entries carry the file type from the directory read itself,
+                # so is_dir() below costs no extra syscall
+                with os.scandir(path) as it:
+                    files = list(it)
+                if pattern:
+                    files = [entry for entry in files if fnmatch.fnmatch(entry.name, pattern)]
 
             # Sort files (directories first, then files alphabetically)
             files.sort(key=lambda x: (not x.is_dir(), x.name.lower()))
@@ -423,7 +600,135 @@ class ListDirectoryTool(Tool):
             return f"Error listing directory: {e}"
 
 
-class FileSearchTool(Tool):
+# Extensions FileSearchTool treats as text for content search
+_TEXT_EXTENSIONS = frozenset(
+    {
+        ".txt",
+        ".py",
+        ".js",
+        ".java",
+        ".c",
+        ".cpp",
+        ".h",
+        ".md",
+        ".json",
+        ".yaml",
+        ".yml",
+        ".xml",
+        ".html",
+        ".css",
+        ".sh",
+        ".bash",
+        ".sql",
+        ".log",
+    }
+)
+_CONTENT_SEARCH_MAX_BYTES = 1024 * 1024  # 1MB limit
+
+
+def _scandir_tree(root: str) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield ``(relative_path, entry)`` for everything below ``root``, in name order.
+
+    Each directory's entries come before its subdirectories' (like ``Path.rglob``),
+    and symlinked directories are listed but not descended into.
+    """
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            yield rel_path, entry
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, rel_path))
+            except OSError:
+                continue
+        # Reversed so subdirectories are visited in name order
+        stack.extend(reversed(subdirs))
+
+
+def _walk_candidates(root: str) -> Iterator[Tuple[str, str, int]]:
+    """Yield ``(relative_path, absolute_path, size)`` for searchable text files below ``root``.
+
+    The extension is checked before anything is stat'ed, and the size check reuses
+    the stat cached on the ``DirEntry``, so each candidate costs at most one syscall.
+    """
+    for rel_path, entry in _scandir_tree(root):
+        if os.path.splitext(entry.name)[1].lower() not in _TEXT_EXTENSIONS:
+            continue
+        try:
+            if entry.is_file():
+                size = entry.stat().st_size
+                if size <= _CONTENT_SEARCH_MAX_BYTES:
+                    yield rel_path, entry.path, size
+        except OSError:
+            continue
+
+
+def _ignore_case_counter(pattern: str) -> Callable[[bytes], int]:
+    """Build a function counting case-insensitive occurrences of ``pattern`` in UTF-8 bytes.
+
+    The needle is prepared once per search instead of once per scanned file.
+    """
+    if pattern.isascii():
+        needle = pattern.encode()
+        if needle.lower() == needle.upper():
+            # No letters in the needle: case can't matter, so skip lowering the file
+            return lambda data: data.count(needle)
+        # ASCII needles can be matched on raw bytes without decoding the file
+        needle = needle.lower()
+        return lambda data: data.lower().count(needle)
+    folded = pattern.lower()
+    return lambda data: data.decode("utf-8", errors="ignore").lower().count(folded)
+
+
+def _scan_file(file_path: str, size: int, count_matches: Callable[[bytes], int]) -> int:
+    """Return the number of matches in a candidate file (0 if it can't be read).
+
+    The size from the walk sizes the read buffer up front, so a file is read
+    with a single unbuffered read instead of read-to-EOF.
+    """
+    try:
+        data = _read_exact(file_path, size)
+    except OSError:
+        return 0
+    return count_matches(data)
+
+
+def _scan_candidates(
+    candidates: Iterator[Tuple[str, str, int]], count_matches: Callable[[bytes], int]
+) -> Iterator[Tuple[str, int]]:
+    """Yield ``(relative_path, match_count)`` for each candidate, in walk order.
+
+    Reads release the GIL, so a small pool overlaps disk I/O with scanning. Only a
+    bounded window of files is queued ahead of the consumer, so a caller that stops
+    early (max_results reached) also stops the directory walk.
+    """
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        try:
+            for rel_path, file_path, size in candidates:
+                window.append((rel_path, pool.submit(_scan_file, file_path, size, count_matches)))
+                if len(window) >= 2 * workers:
+                    rel_path, future = window.popleft()
+                    yield rel_path, future.result()
+            while window:
+                rel_path, future = window.popleft()
+                yield rel_path, future.result()
+        finally:
+            # Scans queued past an early stop are dropped before the pool joins
+            for _, future in window:
+                future.cancel()
+
+
+class FileSearchTool(_WorkingDirMixin, Tool):
     """Search for files by name pattern or content.
 
     Essential for finding specific files, grep-like functionality in SRE/DevOps tasks.
@@ -460,29 +765,7 @@ class FileSearchTool(Tool):
     def __init__(self, working_dir: Optional[str] = None):
         """Initialize FileSearchTool with optional working directory."""
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, dir_path: str) -> Path:
-        """Validate and resolve directory path."""
-        path = Path(dir_path)
-
-        if not path.is_absolute():
-            path = self.working_dir / path
-
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-
-        return path
+        self._init_working_dir(working_dir)
 
     def forward(
         self,
@@ -500,22 +783,34 @@ class FileSearchTool(Tool):
             # Validate path
             path = self._validate_path(directory)
 
-            if not path.exists():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return f"Error: Directory not found: {directory}"
 
-            if not path.is_dir():
+            if not stat.S_ISDIR(st.st_mode):
                 return f"Error: Path is not a directory: {directory}"
 
             results = []
 
             if search_type == "name":
                 # Search by filename using glob
-                matches = path.rglob(pattern)
-                for match in matches:
+                if "/" in pattern or os.sep in pattern:
+                    # Multi-component patterns still need pathlib globbing
+                    matches = (
+                        (str(match.relative_to(path)), match) for match in path.rglob(pattern)
+                    )
+                else:
+                    # Match names straight off the scandir entries; no Path per entry
+                    matches = (
+                        (rel_path, entry)
+                        for rel_path, entry in _scandir_tree(str(path))
+                        if fnmatch.fnmatch(entry.name, pattern)
+                    )
+                for rel_path, match in matches:
                     if len(results) >= max_results:
                         break
                     try:
-                        rel_path = match.relative_to(path)
                         if match.is_file():
                             size = match.stat().st_size
                             results.append(f"{rel_path} ({size} bytes)")
@@ -527,55 +822,14 @@ class FileSearchTool(Tool):
             else:  # search_type == "content"
                 # Search by content (grep-like)
                 # Only search text files (limit by extension for safety)
-                text_extensions = {
-                    ".txt",
-                    ".py",
-                    ".js",
-                    ".java",
-                    ".c",
-                    ".cpp",
-                    ".h",
-                    ".md",
-                    ".json",
-                    ".yaml",
-                    ".yml",
-                    ".xml",
-                    ".html",
-                    ".css",
-                    ".sh",
-                    ".bash",
-                    ".sql",
-                    ".log",
-                }
-
-                for file_path in path.rglob("*"):
-                    if len(results) >= max_results:
-                        break
-
-                    if not file_path.is_file():
-                        continue
-
-                    if file_path.suffix.lower() not in text_extensions:
-                        continue
-
-                    # Check file size (don't search large files)
-                    try:
-                        if file_path.stat().st_size > 1024 * 1024:  # 1MB limit
-                            continue
-                    except OSError:
-                        continue
-
-                    # Search file content
-                    try:
-                        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                            content = f.read()
-                            if pattern.lower() in content.lower():
-                                rel_path = file_path.relative_to(path)
-                                # Count occurrences
-                                count = content.lower().count(pattern.lower())
-                                results.append(f"{rel_path} ({count} matches)")
-                    except (OSError, UnicodeDecodeError):
-                        continue
+                # (and skip large files)
+                scans = _scan_candidates(_walk_candidates(str(path)), _ignore_case_counter(pattern))
+                with closing(scans):
+                    for rel_path, count in scans:
+                        if count:
+                            results.append(f"{rel_path} ({count} matches)")
+                            if len(results) >= max_results:
+                                break
 
             # Format output
             if not results:
@@ -603,7 +857,213 @@ class FileSearchTool(Tool):
 # ============================================================================
 
 
-class GrepTool(Tool):
+def _text_tool_errors(forward: Callable[..., str]) -> Callable[..., str]:
+    """Turn the exceptions a text tool's ``forward`` raises into "Error: ..." results."""
+
+    @wraps(forward)
+    def wrapper(self, file_path: str, *args, **kwargs) -> str:
+        try:
+            return forward(self, file_path, *args, **kwargs)
+        except UnicodeDecodeError:
+            return f"Error: Cannot read {file_path} - not a text file"
+        except ValueError as e:
+            return f"Error: {e}"
+        except PermissionError:
+            return f"Error: Permission denied: {file_path}"
+        except Exception as e:
+            return f"Error: {e}"
+
+    return wrapper
+
+
+class _ResultCache:
+    """Small LRU of text tool results, keyed on the call and the input file's identity.
+
+    Agents often repeat an identical grep/sed/head call on an unchanged file. The
+    file's device, inode, size and timestamps are part of the key, so any write to it
+    turns the next call into a miss. Error results are never stored.
+    """
+
+    def __init__(self, max_entries: int, max_chars: int):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, st: os.stat_result, compute: partial) -> str:
+        """Return the cached result of ``compute()`` for the file described by ``st``."""
+        key = (
+            st.st_dev,
+            st.st_ino,
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_ctime_ns,
+            compute.func.__qualname__,
+            compute.args,
+            tuple(compute.keywords.items()),
+        )
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+
+        result = compute()
+        if result.startswith("Error") or len(result) > self.max_chars:
+            return result
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = result
+                self._chars += len(result)
+                while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._chars -= len(evicted)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+
+_TEXT_RESULTS = _ResultCache(max_entries=64, max_chars=16 * 1024 * 1024)
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile ``pattern`` once; agents tend to grep/sed the same pattern across many files."""
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=64)
+def _hyperscan_database(pattern: str, case_insensitive: bool):
+    """Compile ``pattern`` to a Hyperscan block-mode database, or None if it can't be."""
+    flags = hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    if case_insensitive:
+        flags |= hyperscan.HS_FLAG_CASELESS
+    db = hyperscan.Database()
+    try:
+        db.compile(expressions=[pattern.encode("utf-8")], flags=[flags])
+    except hyperscan.error:
+        # Backreferences, lookarounds and friends are not supported by Hyperscan
+        return None
+    return db
+
+
+def _hyperscan_count_lines(
+    path: Path, regex: re.Pattern, case_insensitive: bool, invert_match: bool
+) -> Optional[int]:
+    """Count the lines of ``path`` matching ``regex`` with a single Hyperscan pass.
+
+    Hyperscan only proposes candidate lines (those a match event ends on); each is
+    confirmed with ``regex`` so the count agrees exactly with the per-line re scan.
+    Returns None when the fast path doesn't apply and the caller should use re.
+    """
+    if hyperscan is None:
+        return None
+    db = _hyperscan_database(regex.pattern, case_insensitive)
+    if db is None:
+        return None
+    data = path.read_bytes()
+    # Text mode would translate "\r" line endings and replace undecodable bytes; leave
+    # such files to the re path (HS_FLAG_UTF8 also requires valid UTF-8)
+    if b"\r" in data:
+        return None
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    # re's IGNORECASE also folds non-ASCII letters (É/é, the Kelvin sign and k), which
+    # Hyperscan's caseless mode isn't relied on to match; only all-ASCII input is safe
+    if case_insensitive and not (data.isascii() and regex.pattern.isascii()):
+        return None
+
+    ends = []
+    db.scan(data, match_event_handler=lambda _id, _start, end, _flags, _ctx: ends.append(end))
+
+    count = 0
+    line_end = -1
+    search = regex.search
+    for end in ends:
+        last = end - 1  # offset of the match's final byte
+        if last <= line_end:
+            continue  # another match on a line already checked
+        line_start = data.rfind(b"\n", 0, last) + 1
+        line_end = data.find(b"\n", last)
+        if line_end < 0:
+            line_end = len(data)
+        if search(data[line_start : line_end + 1].decode("utf-8")):
+            count += 1
+
+    if invert_match:
+        total = data.count(b"\n") + (not data.endswith(b"\n") and bool(data))
+        return total - count
+    return count
+
+
+# Characters that give a sed pattern (or, for backslash, its replacement) regex meaning
+_REGEX_META = frozenset(".^$*+?()[]{}|\\")
+
+# Anchors, word boundaries and lookarounds look past a line's end, so substitutions
+# using them are never collapsed into one whole-text call ("^" opening a class is fine)
+_LINE_SENSITIVE_SYNTAX = re.compile(r"(?<!\[)\^|\$|\\[AZbB]|\(\?<?[=!]")
+
+
+def _sub_whole_text(regex: re.Pattern, replacement: str, text: str) -> Optional[str]:
+    """Globally substitute ``regex`` in ``text`` with one call, as if done line by line.
+
+    Returns None when the result could differ from a per-line substitution: the pattern
+    uses zero-width assertions, can match empty at the end of a line, or has a match
+    crossing a newline.
+    """
+    if _LINE_SENSITIVE_SYNTAX.search(regex.pattern) or regex.match("\n", 1):
+        return None
+    if any(map(operator.contains, map(re.Match.group, regex.finditer(text)), repeat("\n"))):
+        return None
+    return regex.sub(replacement, text)
+
+
+# Leading number of a line (after any indentation), used by SortTool's numeric sort
+_NUMERIC_PREFIX = re.compile(r"\s*(-?\d+\.?\d*)")
+
+
+def _numeric_sort_key(line: str) -> float:
+    """Sort key for SortTool's numeric mode: the line's leading number, or 0."""
+    # The regex skips leading whitespace itself, so no strip() copy per line; what it
+    # captures always parses as a float
+    match = _NUMERIC_PREFIX.match(line)
+    return float(match.group(1)) if match else 0
+
+
+def _is_literal(pattern: str) -> bool:
+    """Whether ``pattern`` matches only itself, so plain substring search can stand in."""
+    return bool(pattern) and _REGEX_META.isdisjoint(pattern) and "\n" not in pattern
+
+
+def _iter_literal_matches(f, needle: str, chunk_size: int = 1024 * 1024):
+    """Yield ``(index, line)`` for the lines of text file ``f`` containing ``needle``.
+
+    The file is read in line-aligned chunks and scanned with str.find, so lines without
+    a match are never split out into Python objects.
+    """
+    base = 0  # index of the chunk's first line
+    while chunk := f.read(chunk_size):
+        if not chunk.endswith("\n"):
+            chunk += f.readline()
+        find = chunk.find
+        lineno = base
+        counted = pos = 0
+        while (hit := find(needle, pos)) != -1:
+            start = chunk.rfind("\n", 0, hit) + 1
+            pos = find("\n", hit) + 1 or len(chunk)
+            lineno += chunk.count("\n", counted, start)
+            counted = start
+            yield lineno, chunk[start:pos]
+        base += chunk.count("\n")
+
+
+class GrepTool(_WorkingDirMixin, Tool):
     """Search for patterns in files with regex support (grep-like)."""
 
     name = "grep"
@@ -656,25 +1116,9 @@ class GrepTool(Tool):
 
     def __init__(self, working_dir: Optional[str] = None):
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, file_path: str) -> Path:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = self.working_dir / path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-        return path
+        self._init_working_dir(working_dir)
 
+    @_text_tool_errors
     def forward(
         self,
         file_path: str,
@@ -686,69 +1130,130 @@ class GrepTool(Tool):
         invert_match: bool = False,
         count_only: bool = False,
     ) -> str:
-        import re
+        path = self._validate_path(file_path)
+        st, error = _stat_regular_file(path, file_path)
+        if error:
+            return error
+        return _TEXT_RESULTS.get_or_compute(
+            st,
+            partial(
+                self._grep,
+                path,
+                file_path,
+                pattern,
+                case_insensitive,
+                line_numbers,
+                context_before,
+                context_after,
+                invert_match,
+                count_only,
+            ),
+        )
 
+    def _grep(
+        self,
+        path: Path,
+        file_path: str,
+        pattern: str,
+        case_insensitive: bool,
+        line_numbers: bool,
+        context_before: int,
+        context_after: int,
+        invert_match: bool,
+        count_only: bool,
+    ) -> str:
+        flags = re.IGNORECASE if case_insensitive else 0
         try:
-            path = self._validate_path(file_path)
-            if not path.exists():
-                return f"Error: File not found: {file_path}"
-            if not path.is_file():
-                return f"Error: Path is not a file: {file_path}"
-
-            flags = re.IGNORECASE if case_insensitive else 0
-            try:
-                regex = re.compile(pattern, flags)
-            except re.error as e:
-                return f"Error: Invalid regex pattern '{pattern}': {e}"
-
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            matches = []
-            for i, line in enumerate(lines):
-                is_match = bool(regex.search(line))
-                if invert_match:
-                    is_match = not is_match
-                if is_match:
-                    matches.append(i)
-
+            regex = _compile_regex(pattern, flags)
+        except re.error as e:
+            return f"Error: Invalid regex pattern '{pattern}': {e}"
+
+        match_count = 0
+        last_shown = -1
+        last_line = ""
+        # Lines are written as read, newline included, straight into one buffer: no
+        # per-line list entries or rstrip() copies, and no separate join at the end
+        out = io.StringIO()
+        write = out.write
+        write(f"Matches in {file_path} (pattern: '{pattern}'):\n")
+
+        def show(i: int, line: str, is_match: bool) -> None:
+            nonlocal last_shown, last_line
+            if last_shown >= 0 and i != last_shown + 1:
+                write("--\n")
+            if line_numbers:
+                write(f"{i + 1}{':' if is_match else '-'}{line}")
+            else:
+                write(line)
+            last_shown = i
+            last_line = line
+
+        # Stream the file: only the pending before-context is kept in memory
+        before = deque(maxlen=context_before) if context_before > 0 else None
+        remaining_after = 0
+        search = regex.search
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            literal = not case_insensitive and not invert_match and _is_literal(pattern)
             if count_only:
-                return f"{len(matches)} matches in {file_path}"
-            if not matches:
-                return f"No matches found for pattern '{pattern}' in {file_path}"
-
-            output_lines = []
-            shown_lines = set()
-            for match_idx in matches:
-                start = max(0, match_idx - context_before)
-                end = min(len(lines), match_idx + context_after + 1)
-                if output_lines and start > 0 and start - 1 not in shown_lines:
-                    output_lines.append("--")
-                for i in range(start, end):
-                    if i not in shown_lines:
-                        line = lines[i].rstrip("\n")
-                        if line_numbers:
-                            prefix = f"{i + 1}:" if i == match_idx else f"{i + 1}-"
-                            output_lines.append(f"{prefix}{line}")
-                        else:
-                            output_lines.append(line)
-                        shown_lines.add(i)
-
-            result = f"Matches in {file_path} (pattern: '{pattern}'):\n"
-            result += "\n".join(output_lines)
-            return result
-
-        except UnicodeDecodeError:
-            return f"Error: Cannot read {file_path} - not a text file"
-        except ValueError as e:
-            return f"Error: {e}"
-        except PermissionError:
-            return f"Error: Permission denied: {file_path}"
-        except Exception as e:
-            return f"Error: {e}"
-
-
-class SedTool(Tool):
+                if literal:
+                    match_count = sum(1 for _ in _iter_literal_matches(f, pattern))
+                    return f"{match_count} matches in {file_path}"
+                fast_count = _hyperscan_count_lines(path, regex, case_insensitive, invert_match)
+                if fast_count is not None:
+                    return f"{fast_count} matches in {file_path}"
+                # map() drives the per-line search from C, with no bytecode per line
+                match_count = sum(map(operator.not_ if invert_match else bool, map(search, f)))
+                return f"{match_count} matches in {file_path}"
+
+            if not context_before and not context_after:
+                # Without context only matching lines matter, so the loop body below
+                # runs once per match instead of once per line
+                if literal:
+                    # Plain text: str.find over big chunks locates the matching lines
+                    matches = _iter_literal_matches(f, pattern)
+                else:
+                    # tee the stream so compress() pairs each line with its search
+                    # result in C
+                    lines, probe = tee(f)
+                    hits = map(operator.not_ if invert_match else bool, map(search, probe))
+                    matches = compress(enumerate(lines), hits)
+                # show() inlined: with invert_match nearly every line lands here
+                line = ""
+                previous = -1
+                for i, line in matches:
+                    if i != previous + 1 and previous >= 0:
+                        write("--\n")
+                    write(f"{i + 1}:{line}" if line_numbers else line)
+                    previous = i
+                    match_count += 1
+                last_line = line
+            else:
+                for i, line in enumerate(f):
+                    is_match = (search(line) is not None) != invert_match
+                    if is_match:
+                        match_count += 1
+                        if before:
+                            for j, previous in before:
+                                show(j, previous, False)
+                            before.clear()
+                        show(i, line, True)
+                        remaining_after = context_after
+                    elif remaining_after > 0:
+                        show(i, line, False)
+                        remaining_after -= 1
+                    elif before is not None:
+                        before.append((i, line))
+
+        if not match_count:
+            return f"No matches found for pattern '{pattern}' in {file_path}"
+
+        # Only the file's last line can lack a newline; the result has no trailing one.
+        # Slicing the value is cheaper than truncate(), which converts the buffer first
+        result = out.getvalue()
+        return result[:-1] if last_line.endswith("\n") else result
+
+
+class SedTool(_WorkingDirMixin, Tool):
     """Stream editor for text transformations (sed-like)."""
 
     name = "sed"
@@ -786,25 +1291,9 @@ class SedTool(Tool):
 
     def __init__(self, working_dir: Optional[str] = None):
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, file_path: str) -> Path:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = self.working_dir / path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-        return path
+        self._init_working_dir(working_dir)
 
+    @_text_tool_errors
     def forward(
         self,
         file_path: str,
@@ -813,76 +1302,163 @@ class SedTool(Tool):
         case_insensitive: bool = False,
         output_file: Optional[str] = None,
     ) -> str:
-        import re
-
-        try:
-            path = self._validate_path(file_path)
-            if not path.exists():
-                return f"Error: File not found: {file_path}"
-            if not path.is_file():
-                return f"Error: Path is not a file: {file_path}"
-
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+        path = self._validate_path(file_path)
+        st, error = _stat_regular_file(path, file_path)
+        if error:
+            return error
 
-            transformed_lines = []
+        run = partial(
+            self._sed, path, file_path, command, global_replace, case_insensitive, output_file
+        )
+        # Writing an output file is a side effect, so only pure transforms are cached
+        return run() if output_file else _TEXT_RESULTS.get_or_compute(st, run)
 
-            if command.startswith("s/") and command.count("/") >= 2:
-                parts = command[2:].split("/", 2)
-                if len(parts) < 2:
-                    return f"Error: Invalid substitution command '{command}'"
-                pattern, replacement = parts[0], parts[1]
+    def _sed(
+        self,
+        path: Path,
+        file_path: str,
+        command: str,
+        global_replace: bool,
+        case_insensitive: bool,
+        output_file: Optional[str],
+    ) -> str:
+        # Optional str -> str equivalent of transform() over the whole file at once
+        whole_text = None
+        if command.startswith("s/") and command.count("/") >= 2:
+            parts = command[2:].split("/", 2)
+            if len(parts) < 2:
+                return f"Error: Invalid substitution command '{command}'"
+            pattern, replacement = parts[0], parts[1]
+            if (
+                pattern
+                and not case_insensitive
+                and _REGEX_META.isdisjoint(pattern)
+                and "\\" not in replacement
+            ):
+                # Plain text on both sides: str.replace does the same substitution
+                # without going through the regex engine
+                substitute = operator.methodcaller(
+                    "replace", pattern, replacement, -1 if global_replace else 1
+                )
+                if global_replace and "\n" not in pattern:
+                    whole_text = operator.methodcaller("replace", pattern, replacement)
+            else:
                 flags = re.IGNORECASE if case_insensitive else 0
                 try:
-                    regex = re.compile(pattern, flags)
+                    regex = _compile_regex(pattern, flags)
                 except re.error as e:
                     return f"Error: Invalid regex pattern '{pattern}': {e}"
-                count = 0 if global_replace else 1
-                for line in lines:
-                    transformed_lines.append(regex.sub(replacement, line, count=count))
+                substitute = partial(regex.sub, replacement, count=0 if global_replace else 1)
+                if global_replace:
+                    whole_text = partial(_sub_whole_text, regex, replacement)
 
-            elif command.endswith("/d") and command.startswith("/"):
-                pattern = command[1:-2]
-                flags = re.IGNORECASE if case_insensitive else 0
-                try:
-                    regex = re.compile(pattern, flags)
-                except re.error as e:
-                    return f"Error: Invalid regex pattern '{pattern}': {e}"
-                for line in lines:
-                    if not regex.search(line):
-                        transformed_lines.append(line)
-
-            elif command.endswith("p") and command[:-1].isdigit():
-                line_num = int(command[:-1])
-                if 1 <= line_num <= len(lines):
-                    return lines[line_num - 1].rstrip("\n")
-                else:
-                    return f"Error: Line {line_num} out of range (file has {len(lines)} lines)"
-            else:
-                return f"Error: Unsupported command '{command}'. Use 's/pattern/replacement/', '/pattern/d', or 'Np'"
+            def transform(lines):
+                return map(substitute, lines)
 
-            result_text = "".join(transformed_lines)
+        elif command.endswith("/d") and command.startswith("/"):
+            pattern = command[1:-2]
+            flags = re.IGNORECASE if case_insensitive else 0
+            try:
+                regex = _compile_regex(pattern, flags)
+            except re.error as e:
+                return f"Error: Invalid regex pattern '{pattern}': {e}"
 
-            if output_file:
-                output_path = self._validate_path(output_file)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(result_text)
-                return f"Transformation complete. Output written to: {output_file}\nLines: {len(transformed_lines)}"
-            else:
+            def transform(lines):
+                return filterfalse(regex.search, lines)
+
+        elif command.endswith("p") and command[:-1].isdigit():
+            line_num = int(command[:-1])
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                total = 0
+                for total, line in enumerate(f, 1):
+                    if total == line_num:
+                        return line.rstrip("\n")
+            return f"Error: Line {line_num} out of range (file has {total} lines)"
+        else:
+            return f"Error: Unsupported command '{command}'. Use 's/pattern/replacement/', '/pattern/d', or 'Np'"
+
+        # Undecodable bytes are carried through unchanged into an output file, and
+        # shown as U+FFFD when the text is returned instead
+        errors = "surrogateescape" if output_file else "replace"
+        if whole_text is not None:
+            # One substitution call over the whole text rather than one per line
+            with open(path, "r", encoding="utf-8", errors=errors) as f:
+                text = f.read()
+            result_text = whole_text(text)
+            if result_text is None:
+                result_text = "".join(transform(io.StringIO(text)))
+            if not output_file:
                 return f"Transformation result:\n{result_text}"
-
-        except UnicodeDecodeError:
-            return f"Error: Cannot read {file_path} - not a text file"
-        except ValueError as e:
-            return f"Error: {e}"
-        except PermissionError:
-            return f"Error: Permission denied: {file_path}"
-        except Exception as e:
-            return f"Error: {e}"
+            output_path = self._validate_path(output_file)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w", encoding="utf-8", errors=errors) as f:
+                f.write(result_text)
+            written = text.count("\n") + (bool(text) and not text.endswith("\n"))
+            return f"Transformation complete. Output written to: {output_file}\nLines: {written}"
+
+        if output_file:
+            output_path = self._validate_path(output_file)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "r", encoding="utf-8", errors=errors) as fin:
+                # Stream line by line; an in-place edit must read everything before the
+                # output truncates the input
+                source = fin.readlines() if output_path == path else fin
+                written = 0
+                with open(output_path, "w", encoding="utf-8", errors=errors) as fout:
+                    for line in transform(source):
+                        fout.write(line)
+                        written += 1
+            return f"Transformation complete. Output written to: {output_file}\nLines: {written}"
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                result_text = "".join(transform(f))
+            return f"Transformation result:\n{result_text}"
+
+
+# Inputs above this size are sorted out of core when the result goes to a file
+_SORT_IN_MEMORY_MAX_BYTES = 256 * 1024 * 1024
+_SORT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _external_sort(
+    src: Path, dst: Path, key: Optional[Callable[[str], object]], reverse: bool
+) -> int:
+    """Sort the lines of ``src`` into ``dst`` holding one chunk in memory at a time.
+
+    Each chunk is sorted into a temporary file and the runs are combined with
+    heapq.merge, which is stable like list.sort. Returns the number of lines.
+    """
+    runs = []
+    total = 0
+    # Every sorted run stays open until the merge is written, then all are closed
+    with ExitStack() as open_runs:
+        with open(src, "r", encoding="utf-8", errors="surrogateescape") as f:
+            while chunk := f.readlines(_SORT_CHUNK_BYTES):
+                # Compare lines without their newline, as the in-memory sort does
+                lines = "".join(chunk).split("\n")
+                if lines[-1] == "":
+                    lines.pop()
+                lines.sort(key=key, reverse=reverse)
+                run = open_runs.enter_context(
+                    tempfile.TemporaryFile("w+", encoding="utf-8", errors="surrogateescape")
+                )
+                runs.append(run)
+                run.write("\n".join(lines))
+                run.write("\n")
+                run.seek(0)
+                total += len(lines)
+
+        merged = heapq.merge(
+            *[(line[:-1] for line in run) for run in runs], key=key, reverse=reverse
+        )
+        with open(dst, "w", encoding="utf-8", errors="surrogateescape") as out:
+            for line in merged:
+                out.write(line)
+                out.write("\n")
+    return total
 
 
-class SortTool(Tool):
+class SortTool(_WorkingDirMixin, Tool):
     """Sort lines in a file."""
 
     name = "sort"
@@ -925,25 +1501,9 @@ class SortTool(Tool):
 
     def __init__(self, working_dir: Optional[str] = None):
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, file_path: str) -> Path:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = self.working_dir / path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-        return path
+        self._init_working_dir(working_dir)
 
+    @_text_tool_errors
     def forward(
         self,
         file_path: str,
@@ -953,78 +1513,130 @@ class SortTool(Tool):
         case_insensitive: bool = False,
         output_file: Optional[str] = None,
     ) -> str:
-        try:
-            path = self._validate_path(file_path)
-            if not path.exists():
-                return f"Error: File not found: {file_path}"
-            if not path.is_file():
-                return f"Error: Path is not a file: {file_path}"
-
-            with open(path, "r", encoding="utf-8") as f:
-                lines = [line.rstrip("\n") for line in f.readlines()]
-
-            original_count = len(lines)
-
+        path = self._validate_path(file_path)
+        st, error = _stat_regular_file(path, file_path)
+        if error:
+            return error
+
+        # Undecodable bytes are carried through unchanged into an output file, and
+        # shown as U+FFFD when the text is returned instead
+        errors = "surrogateescape" if output_file else "replace"
+
+        if numeric:
+            key = _numeric_sort_key
+        elif case_insensitive:
+            key = str.lower
+        else:
+            key = None
+
+        if output_file and not unique and st.st_size > _SORT_IN_MEMORY_MAX_BYTES:
+            output_path = self._validate_path(output_file)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            original_count = _external_sort(path, output_path, key, reverse)
+            return f"Sorted {original_count} lines. Output written to: {output_file}"
+
+        # One read and one C-level split instead of readlines() plus a per-line
+        # rstrip(). split("\n") rather than splitlines(), which would also break
+        # on form feeds, \x1c-\x1e and Unicode line separators inside a line
+        with open(path, "r", encoding="utf-8", errors=errors) as f:
+            lines = f.read().split("\n")
+        if lines[-1] == "":
+            lines.pop()
+
+        original_count = len(lines)
+
+        if unique and not case_insensitive:
+            # Order-preserving dedup in one C-level pass
+            lines = list(dict.fromkeys(lines))
+        elif unique:
+            # Keep the first spelling of each case-folded line; the plain loop
+            # measured faster than dict/zip pipelines that fold every line twice
+            seen = set()
+            unique_lines = []
+            for line in lines:
+                folded = line.lower()
+                if folded not in seen:
+                    seen.add(folded)
+                    unique_lines.append(line)
+            lines = unique_lines
+
+        lines.sort(key=key, reverse=reverse)
+
+        result_text = "\n".join(lines) + "\n" if lines else ""
+
+        if output_file:
+            output_path = self._validate_path(output_file)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w", encoding="utf-8", errors=errors) as f:
+                f.write(result_text)
+            msg = f"Sorted {original_count} lines"
             if unique:
-                seen = set()
-                unique_lines = []
-                for line in lines:
-                    key = line.lower() if case_insensitive else line
-                    if key not in seen:
-                        seen.add(key)
-                        unique_lines.append(line)
-                lines = unique_lines
-
-            if numeric:
-
-                def numeric_key(line):
-                    import re
-
-                    match = re.match(r"^(-?\d+\.?\d*)", line.strip())
-                    if match:
-                        try:
-                            return float(match.group(1))
-                        except ValueError:
-                            return 0
-                    return 0
-
-                lines.sort(key=numeric_key, reverse=reverse)
-            else:
-                if case_insensitive:
-                    lines.sort(key=str.lower, reverse=reverse)
-                else:
-                    lines.sort(reverse=reverse)
-
-            result_text = "\n".join(lines) + "\n" if lines else ""
-
-            if output_file:
-                output_path = self._validate_path(output_file)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(result_text)
-                msg = f"Sorted {original_count} lines"
-                if unique:
-                    msg += f" ({len(lines)} unique)"
-                msg += f". Output written to: {output_file}"
-                return msg
-            else:
-                header = f"Sorted {original_count} lines"
-                if unique:
-                    header += f" ({len(lines)} unique)"
-                header += ":\n"
-                return header + result_text
-
-        except UnicodeDecodeError:
-            return f"Error: Cannot read {file_path} - not a text file"
-        except ValueError as e:
-            return f"Error: {e}"
-        except PermissionError:
-            return f"Error: Permission denied: {file_path}"
-        except Exception as e:
-            return f"Error: {e}"
-
-
-class HeadTailTool(Tool):
+                msg += f" ({len(lines)} unique)"
+            msg += f". Output written to: {output_file}"
+            return msg
+        else:
+            header = f"Sorted {original_count} lines"
+            if unique:
+                header += f" ({len(lines)} unique)"
+            header += ":\n"
+            return header + result_text
+
+
+_TAIL_CHUNK_SIZE = 64 * 1024
+# Files up to this size are read whole by HeadTailTool instead of counted and seeked
+_HEAD_TAIL_SLURP_BYTES = 256 * 1024
+
+
+# Line ends as text-mode readlines() splits them: \r\n, a lone \r, or \n
+_LINE_BREAK = re.compile(rb"\r\n?|\n")
+
+
+def _count_line_breaks(data: bytes) -> int:
+    """Count universal-newline line breaks in ``data`` (``\r\n`` counts once)."""
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+
+
+def _count_lines(path: Path) -> int:
+    """Count lines the way ``readlines()`` would, without decoding or splitting the file."""
+    count = 0
+    last = b""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            count += _count_line_breaks(chunk)
+            # A \r\n split across two chunks was counted once in each
+            if last.endswith(b"\r") and chunk.startswith(b"\n"):
+                count -= 1
+            last = chunk
+    if last and not last.endswith((b"\n", b"\r")):
+        count += 1
+    return count
+
+
+def _tail_lines(path: Path, n: int) -> List[str]:
+    """Return the last ``n`` lines of a UTF-8 file, reading backwards from the end."""
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        # n + 1 line breaks guarantee the first of the last n lines starts inside the buffer
+        while pos > 0 and newlines <= n:
+            size = min(_TAIL_CHUNK_SIZE, pos)
+            pos -= size
+            f.seek(pos)
+            chunk = f.read(size)
+            newlines += _count_line_breaks(chunk)
+            if chunks and chunk.endswith(b"\r") and chunks[-1].startswith(b"\n"):
+                newlines -= 1
+            chunks.append(chunk)
+    data = b"".join(reversed(chunks))
+    if pos > 0:
+        # Drop the partial first line; CR and LF bytes are always UTF-8 character boundaries
+        data = data[_LINE_BREAK.search(data).end() :]
+    with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace") as text:
+        return text.readlines()[-n:]
+
+
+class HeadTailTool(_WorkingDirMixin, Tool):
     """View first or last N lines of a file (head/tail)."""
 
     name = "head_tail"
@@ -1052,61 +1664,52 @@ class HeadTailTool(Tool):
 
     def __init__(self, working_dir: Optional[str] = None):
         super().__init__()
-        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
-
-    def _validate_path(self, file_path: str) -> Path:
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = self.working_dir / path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ValueError(f"Invalid path: {e}")
-        if self.working_dir:
-            try:
-                path.relative_to(self.working_dir.resolve())
-            except ValueError:
-                raise ValueError(
-                    f"Access denied: Path {path} is outside working directory {self.working_dir}"
-                )
-        return path
+        self._init_working_dir(working_dir)
 
+    @_text_tool_errors
     def forward(self, file_path: str, mode: str = "head", lines: int = 10) -> str:
-        try:
-            path = self._validate_path(file_path)
-            if not path.exists():
-                return f"Error: File not found: {file_path}"
-            if not path.is_file():
-                return f"Error: Path is not a file: {file_path}"
-            if mode not in ["head", "tail"]:
-                return f"Error: Invalid mode '{mode}'. Use 'head' or 'tail'"
-            if lines < 1:
-                return "Error: Number of lines must be at least 1"
-
-            with open(path, "r", encoding="utf-8") as f:
-                all_lines = f.readlines()
+        path = self._validate_path(file_path)
+        st, error = _stat_regular_file(path, file_path)
+        if error:
+            return error
+        if mode not in ["head", "tail"]:
+            return f"Error: Invalid mode '{mode}'. Use 'head' or 'tail'"
+        if lines < 1:
+            return "Error: Number of lines must be at least 1"
+
+        return _TEXT_RESULTS.get_or_compute(
+            st, partial(self._head_tail, path, st.st_size, file_path, mode, lines)
+        )
 
+    def _head_tail(self, path: Path, size: int, file_path: str, mode: str, lines: int) -> str:
+        if size <= _HEAD_TAIL_SLURP_BYTES:
+            # Small file: one read serves both the line count and the lines
+            with open(path, "rb") as f:
+                data = f.read()
+            with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace") as text:
+                all_lines = text.readlines()
             total_lines = len(all_lines)
-
+            result_lines = all_lines[:lines] if mode == "head" else all_lines[-lines:]
+        else:
+            # Only the requested lines are decoded; the total for the header is a raw
+            # line-break count, so the rest of the file is never split into lines
+            total_lines = _count_lines(path)
             if mode == "head":
-                result_lines = all_lines[:lines]
-                header = f"First {len(result_lines)} lines of {file_path} (total: {total_lines} lines):\n"
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    result_lines = list(islice(f, lines))
             else:
-                result_lines = all_lines[-lines:] if len(all_lines) >= lines else all_lines
-                header = (
-                    f"Last {len(result_lines)} lines of {file_path} (total: {total_lines} lines):\n"
-                )
+                result_lines = _tail_lines(path, lines)
 
-            return header + "".join(result_lines)
+        if mode == "head":
+            header = (
+                f"First {len(result_lines)} lines of {file_path} (total: {total_lines} lines):\n"
+            )
+        else:
+            header = (
+                f"Last {len(result_lines)} lines of {file_path} (total: {total_lines} lines):\n"
+            )
 
-        except UnicodeDecodeError:
-            return f"Error: Cannot read {file_path} - not a text file"
-        except ValueError as e:
-            return f"Error: {e}"
-        except PermissionError:
-            return f"Error: Permission denied: {file_path}"
-        except Exception as e:
-            return f"Error: {e}"
+        return header + "".join(result_lines)
 
 
 # ============================================================================
@@ -1283,6 +1886,8 @@ class KillTool(Tool):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # Lowercased once here instead of on every forward() call
+        self._protected_names = frozenset(name.lower() for name in self.PROTECTED_NAMES)
 
     def forward(self, pid: int, force: bool = False) -> str:
         """Terminate a process by PID.
@@ -1317,7 +1922,7 @@ class KillTool(Tool):
             if pid in self.PROTECTED_PIDS:
                 return f"Error: Cannot kill protected system process (PID {pid})"
 
-            if proc_name.lower() in [name.lower() for name in self.PROTECTED_NAMES]:
+            if proc_name.lower() in self._protected_names:
                 return f"Error: Cannot kill protected system process: {proc_name} (PID {pid})"
 
             # Check if it's the current Python process
@@ -1723,6 +2328,17 @@ class CurlTool(Tool):
             return f"Error making HTTP request: {e}"
 
 
+# PingTool's host validation and output parsing, compiled once at import
+_PING_HOST = re.compile(r"(?:[A-Za-z0-9](?:[A-Za-z0-9.-]{0,251}[A-Za-z0-9])?|[0-9A-Fa-f:.]+)")
+_PING_WINDOWS_PACKETS = re.compile(r"Packets: Sent = (\d+), Received = (\d+), Lost = (\d+)")
+_PING_WINDOWS_RTT = re.compile(r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms")
+_PING_UNIX_PACKETS = re.compile(r"(\d+) packets transmitted, (\d+) (?:packets )?received")
+_PING_UNIX_LOSS = re.compile(r"(\d+(?:\.\d+)?)% packet loss")
+_PING_UNIX_RTT = re.compile(
+    r"rtt min/avg/max/(?:mdev|stddev) = ([\d.]+)/([\d.]+)/([\d.]+)/[\d.]+ ms"
+)
+
+
 class PingTool(Tool):
     """Check network connectivity to a host."""
 
@@ -1766,15 +2382,12 @@ class PingTool(Tool):
             Ping statistics including RTT and packet loss
         """
         import platform
-        import re
         import subprocess  # nosec B404
 
         try:
             if not host:
                 return "Error: Host cannot be empty"
-            if host.startswith("-") or not re.fullmatch(
-                r"(?:[A-Za-z0-9](?:[A-Za-z0-9.-]{0,251}[A-Za-z0-9])?|[0-9A-Fa-f:.]+)", host
-            ):
+            if host.startswith("-") or not _PING_HOST.fullmatch(host):
                 return "Error: Host must be a valid hostname or IP address"
 
             if count < 1:
@@ -1807,12 +2420,8 @@ class PingTool(Tool):
                     # Parse output for statistics
                     if system == "windows":
                         # Windows format
-                        packets_match = re.search(
-                            r"Packets: Sent = (\d+), Received = (\d+), Lost = (\d+)", output
-                        )
-                        rtt_match = re.search(
-                            r"Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms", output
-                        )
+                        packets_match = _PING_WINDOWS_PACKETS.search(output)
+                        rtt_match = _PING_WINDOWS_RTT.search(output)
 
                         if packets_match:
                             sent, received, lost = packets_match.groups()
@@ -1828,14 +2437,9 @@ class PingTool(Tool):
 
                     else:
                         # Linux/macOS format
-                        packets_match = re.search(
-                            r"(\d+) packets transmitted, (\d+) (?:packets )?received", output
-                        )
-                        loss_match = re.search(r"(\d+(?:\.\d+)?)% packet loss", output)
-                        rtt_match = re.search(
-                            r"rtt min/avg/max/(?:mdev|stddev) = ([\d.]+)/([\d.]+)/([\d.]+)/[\d.]+ ms",
-                            output,
-                        )
+                        packets_match = _PING_UNIX_PACKETS.search(output)
+                        loss_match = _PING_UNIX_LOSS.search(output)
+                        rtt_match = _PING_UNIX_RTT.search(output)
 
                         if packets_match:
                             sent, received = packets_match.groups()
@@ -1879,6 +2483,35 @@ class PingTool(Tool):
             return f"Error executing ping: {e}"
 
 
+# Environment variable required by each GoogleSearchTool provider
+_SEARCH_PROVIDER_API_KEYS = {
+    "serper": "SERPER_API_KEY",
+    "brave": "BRAVE_API_KEY",
+    "duckduckgo": None,  # DuckDuckGo provider doesn't need API key
+}
+
+# Custom tools by name: (tool class, display name, requires working_dir)
+_CUSTOM_TOOL_SPECS = {
+    # Phase 1: File Operations (require working_dir)
+    "read_file": (ReadFileTool, "ReadFileTool", True),
+    "write_file": (WriteFileTool, "WriteFileTool", True),
+    "list_directory": (ListDirectoryTool, "ListDirectoryTool", True),
+    "search_files": (FileSearchTool, "FileSearchTool", True),
+    # Phase 2: Text Processing (require working_dir)
+    "grep": (GrepTool, "GrepTool", True),
+    "sed": (SedTool, "SedTool", True),
+    "sort": (SortTool, "SortTool", True),
+    "head_tail": (HeadTailTool, "HeadTailTool", True),
+    # Phase 3: Process & System Tools (no working_dir needed)
+    "ps": (PsTool, "PsTool", False),
+    "kill": (KillTool, "KillTool", False),
+    "env": (EnvTool, "EnvTool", False),
+    "which": (WhichTool, "WhichTool", False),
+    "curl": (CurlTool, "CurlTool", False),
+    "ping": (PingTool, "PingTool", False),
+}
+
+
 def get_smolagents_optional_tools(
     enabled_tools: List[str],
     search_provider: str = "duckduckgo",
@@ -1925,15 +2558,6 @@ def get_smolagents_optional_tools(
         List of enabled Tool instances from smolagents.default_tools and custom file tools
     """
 
-    from smolagents.default_tools import (
-        DuckDuckGoSearchTool,
-        GoogleSearchTool,
-        PythonInterpreterTool,
-        UserInputTool,
-        VisitWebpageTool,
-        WikipediaSearchTool,
-    )
-
     # Base authorized imports for PythonInterpreterTool
     base_imports = ["numpy", "sympy", "math", "statistics", "datetime"]
     if additional_imports:
@@ -1944,12 +2568,7 @@ def get_smolagents_optional_tools(
     # GoogleSearchTool - requires API key based on provider
     if "google_search" in enabled_tools:
         try:
-            api_key_map = {
-                "serper": "SERPER_API_KEY",
-                "brave": "BRAVE_API_KEY",
-                "duckduckgo": None,  # DuckDuckGo provider doesn't need API key
-            }
-            required_key = api_key_map.get(search_provider)
+            required_key = _SEARCH_PROVIDER_API_KEYS.get(search_provider)
             if required_key is None or os.getenv(required_key):
                 tools.append(GoogleSearchTool(provider=search_provider))
                 print(f"[TOOLS] Enabled GoogleSearchTool with provider: {search_provider}")
@@ -1995,28 +2614,8 @@ def get_smolagents_optional_tools(
     # Phase 1 & 2 require working_dir for security (path traversal prevention)
     # Phase 3 system tools don't require working_dir
 
-    file_tools_map = {
-        # Phase 1: File Operations (require working_dir)
-        "read_file": (ReadFileTool, "ReadFileTool", True),
-        "write_file": (WriteFileTool, "WriteFileTool", True),
-        "list_directory": (ListDirectoryTool, "ListDirectoryTool", True),
-        "search_files": (FileSearchTool, "FileSearchTool", True),
-        # Phase 2: Text Processing (require working_dir)
-        "grep": (GrepTool, "GrepTool", True),
-        "sed": (SedTool, "SedTool", True),
-        "sort": (SortTool, "SortTool", True),
-        "head_tail": (HeadTailTool, "HeadTailTool", True),
-        # Phase 3: Process & System Tools (no working_dir needed)
-        "ps": (PsTool, "PsTool", False),
-        "kill": (KillTool, "KillTool", False),
-        "env": (EnvTool, "EnvTool", False),
-        "which": (WhichTool, "WhichTool", False),
-        "curl": (CurlTool, "CurlTool", False),
-        "ping": (PingTool, "PingTool", False),
-    }
-
     # Check if any custom tools are requested
-    requested_file_tools = [tool for tool in enabled_tools if tool in file_tools_map]
+    requested_file_tools = [tool for tool in enabled_tools if tool in _CUSTOM_TOOL_SPECS]
 
     if requested_file_tools:
         # Use provided working_dir or default to current directory
@@ -2025,7 +2624,7 @@ def get_smolagents_optional_tools(
 
         for tool_name in requested_file_tools:
             try:
-                tool_class, display_name, requires_working_dir = file_tools_map[tool_name]
+                tool_class, display_name, requires_working_dir = _CUSTOM_TOOL_SPECS[tool_name]
 
                 if requires_working_dir:
                     tools.append(tool_class(working_dir=work_dir))
@@ -2039,6 +2638,12 @@ def get_smolagents_optional_tools(
     return tools
 
 
+@lru_cache(maxsize=1)
+def _default_tools() -> Tuple[Tool, ...]:
+    """Build the deterministic custom tools once per process."""
+    return (WeatherTool(), CalculatorTool(), TimeTool())
+
+
 def get_all_tools(
     search_provider: str = "duckduckgo",
     additional_imports: Optional[List[str]] = None,
@@ -2067,12 +2672,8 @@ def get_all_tools(
     Returns:
         List of all available Tool instances
     """
-    # Start with our 3 custom tools
-    tools = [
-        WeatherTool(),
-        CalculatorTool(),
-        TimeTool(),
-    ]
+    # Start with our 3 custom tools (stateless, so every agent shares one instance each)
+    tools = list(_default_tools())
 
     # Add optional smolagents tools and file tools if requested
     if enabled_smolagents_tools:
@@ -5,12 +5,13 @@ import json
 import os
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 import yaml
-from datasets import Dataset, Features, Value, load_dataset
+from datasets import Dataset, Features, Value, concatenate_datasets, load_dataset
 from huggingface_hub import HfApi, upload_file
 
 from smoltrace.cards import (
@@ -64,20 +65,59 @@ def _build_leaderboard_dataset(existing_data: List[Dict], new_row: Dict) -> Data
     return Dataset.from_list(aligned_rows, features=features)
 
 
+def _append_leaderboard_row(existing: Dataset, new_row: Dict) -> Dataset:
+    """Append ``new_row`` to a loaded leaderboard without decoding the existing rows.
+
+    The stored rows stay in Arrow; only the new row is converted. Columns the
+    history lacks are added as nulls. If the new row's values don't fit the stored
+    column types (e.g. a float in an int column), this falls back to rebuilding the
+    union schema with ``_build_leaderboard_dataset``.
+    """
+    stored = existing.features
+    inferred = Dataset.from_list([new_row]).features
+    features = stored.copy()
+    for column, feature in inferred.items():
+        if column not in stored:
+            features[column] = feature
+        elif feature != stored[column] and feature != Value("null"):
+            if not (stored[column] == Value("float64") and feature == Value("int64")):
+                return _build_leaderboard_dataset([dict(row) for row in existing], new_row)
+    for field in LEADERBOARD_GROUPING_FIELDS:
+        if field not in stored:
+            features[field] = Value("string")
+        elif stored[field] != Value("string"):
+            return _build_leaderboard_dataset([dict(row) for row in existing], new_row)
+
+    for column, feature in features.items():
+        if column not in stored:
+            existing = existing.add_column(column, [None] * existing.num_rows, feature=feature)
+    appended = Dataset.from_list([{column: new_row.get(column) for column in features}], features)
+    return concatenate_datasets([existing, appended])
+
+
+@lru_cache(maxsize=4)
+def _whoami_user_info(token: str) -> Dict:
+    """Call the Hub's whoami endpoint once per token and process.
+
+    Errors propagate and are not cached, so a transient failure is retried next time.
+    """
+    user_info = HfApi(token=token).whoami()
+    return {
+        "username": user_info["name"],
+        "type": user_info["type"],
+        "fullname": user_info.get("fullname"),
+        "email": user_info.get("email"),
+        "avatar_url": user_info.get("avatarUrl"),
+        "isPro": user_info.get("isPro", False),
+        "canPay": user_info.get("canPay", False),
+    }
+
+
 def get_hf_user_info(token: str) -> Optional[Dict]:
     """Fetches user information from Hugging Face Hub using the provided token."""
-    api = HfApi(token=token)
     try:
-        user_info = api.whoami()
-        return {
-            "username": user_info["name"],
-            "type": user_info["type"],
-            "fullname": user_info.get("fullname"),
-            "email": user_info.get("email"),
-            "avatar_url": user_info.get("avatarUrl"),
-            "isPro": user_info.get("isPro", False),
-            "canPay": user_info.get("canPay", False),
-        }
+        # Copy so callers can't modify the cached answer
+        return dict(_whoami_user_info(token))
     except (
         ValueError,
         requests.exceptions.RequestException,
@@ -155,6 +195,26 @@ def load_prompt_config(prompt_file: Optional[str]) -> Optional[Dict]:
         return None
 
 
+# Metric names aggregate_gpu_metrics reports on
+_GPU_AGGREGATED_METRICS = (
+    "gen_ai.gpu.utilization",
+    "gen_ai.gpu.memory.used",
+    "gen_ai.gpu.temperature",
+    "gen_ai.gpu.power",
+    "gen_ai.co2.emissions",
+    "gen_ai.power.cost",
+)
+
+
+def _gpu_datapoint_value(dp: Dict) -> Optional[float]:
+    """Return an OTLP data point's value: a truthy ``asInt`` first, then ``asDouble``."""
+    as_int = dp.get("asInt")
+    if as_int:
+        return int(as_int)
+    as_double = dp.get("asDouble")
+    return None if as_double is None else float(as_double)
+
+
 def aggregate_gpu_metrics(resource_metrics: List[Dict]) -> Dict:
     """
     Aggregate GPU metrics from time-series data.
@@ -178,32 +238,27 @@ def aggregate_gpu_metrics(resource_metrics: List[Dict]) -> Dict:
             "power_cost_total": None,
         }
 
-    # Extract all data points by metric name
-    metrics_by_name = {}
+    # Collect data points only for the metrics aggregated below; other metrics
+    # (fan speed, clocks, ...) are skipped without converting their values
+    metrics_by_name = {name: [] for name in _GPU_AGGREGATED_METRICS}
 
     for rm in resource_metrics:
         for scope_metric in rm.get("scopeMetrics", []):
             for metric in scope_metric.get("metrics", []):
-                metric_name = metric.get("name")
-                data_points = []
+                values = metrics_by_name.get(metric.get("name"))
+                if values is None:
+                    continue
 
                 if "gauge" in metric:
                     data_points = metric["gauge"].get("dataPoints", [])
                 elif "sum" in metric:
                     data_points = metric["sum"].get("dataPoints", [])
+                else:
+                    continue
 
-                if metric_name not in metrics_by_name:
-                    metrics_by_name[metric_name] = []
-
-                for dp in data_points:
-                    value = None
-                    if dp.get("asInt"):
-                        value = int(dp["asInt"])
-                    elif dp.get("asDouble") is not None:
-                        value = float(dp["asDouble"])
-
-                    if value is not None:
-                        metrics_by_name[metric_name].append(value)
+                values.extend(
+                    value for value in map(_gpu_datapoint_value, data_points) if value is not None
+                )
 
     # Compute aggregates
     def safe_avg(values):
@@ -248,8 +303,13 @@ def compute_leaderboard_row(
     purpose: Optional[str] = None,
     suite_version: Optional[str] = None,
     submitted_by: Optional[str] = None,
+    evaluated_at: Optional[datetime] = None,
 ) -> Dict:
-    """Computes a single row for the leaderboard dataset based on evaluation results, traces, and metrics."""
+    """Computes a single row for the leaderboard dataset based on evaluation results, traces, and metrics.
+
+    ``evaluated_at`` stamps the row (default: now), so callers that already took a
+    timestamp for the run can share it.
+    """
     normalized_purpose = purpose.strip().lower() if purpose is not None else None
     if normalized_purpose == "":
         normalized_purpose = None
@@ -257,12 +317,16 @@ def compute_leaderboard_row(
         allowed = ", ".join(sorted(LEADERBOARD_PURPOSES))
         raise ValueError(f"Invalid purpose '{purpose}'. Expected one of: {allowed}")
 
+    now = evaluated_at or datetime.now()
+
     results = all_results.get("tool", []) + all_results.get("code", [])
     if agent_type != "both":
         results = all_results.get(agent_type, [])
 
     num_tests = len(results)
-    success_rate = sum(1 for r in results if r["success"]) / num_tests * 100 if num_tests > 0 else 0
+    # Counted once; reused for success_rate and the successful/failed stats below
+    successful_tests = sum(1 for r in results if r["success"])
+    success_rate = successful_tests / num_tests * 100 if num_tests > 0 else 0
     avg_steps = sum(r["steps"] for r in results) / num_tests if num_tests > 0 else 0
 
     total_tokens = 0
@@ -329,7 +393,6 @@ def compute_leaderboard_row(
             pass
 
     # Calculate additional stats
-    successful_tests = sum(1 for r in results if r["success"])
     failed_tests = num_tests - successful_tests
     avg_tokens = total_tokens / num_tests if num_tests > 0 else 0
     avg_cost = total_cost_usd / num_tests if num_tests > 0 else 0
@@ -340,7 +403,7 @@ def compute_leaderboard_row(
         "model": model_name,
         "agent_type": agent_type,
         "provider": provider,
-        "timestamp": datetime.now().isoformat(),  # Renamed from evaluation_date for UI consistency
+        "timestamp": now.isoformat(),  # Renamed from evaluation_date for UI consistency
         "submitted_by": submitted_by,
         "use_case": _normalize_grouping_value(use_case),
         "team": _normalize_grouping_value(team),
@@ -401,7 +464,7 @@ def compute_leaderboard_row(
             round(gpu_metrics["power_avg"], 2) if gpu_metrics.get("power_avg") is not None else None
         ),
         # Metadata
-        "notes": f"Evaluation on {datetime.now().strftime('%Y-%m-%d')}; {num_tests} tests",
+        "notes": f"Evaluation on {now.strftime('%Y-%m-%d')}; {num_tests} tests",
     }
 
 
@@ -413,18 +476,22 @@ def update_leaderboard(leaderboard_repo: str, new_row: Dict, hf_token: Optional[
     token = hf_token or os.getenv("HF_TOKEN")
     try:
         ds = load_dataset(leaderboard_repo, split="train", **{"to" + "ken": token})  # nosec B615
-        existing_data = [dict(row) for row in ds]
     except (FileNotFoundError, ValueError) as e:  # Catch specific exceptions
         print(f"Creating new leaderboard: {e}")
-        existing_data = []
-    new_ds = _build_leaderboard_dataset(existing_data, new_row)
+        ds = None
+    if ds is None:
+        existing_rows = 0
+        new_ds = _build_leaderboard_dataset([], new_row)
+    else:
+        existing_rows = ds.num_rows
+        new_ds = _append_leaderboard_row(ds, new_row)
     new_ds.push_to_hub(
         leaderboard_repo,
         split="train",
         **{"to" + "ken": token},
         commit_message=f"Update: {new_row['model']} {new_row['agent_type']}",
     )
-    print(f"[OK] Updated leaderboard at {leaderboard_repo} (total rows: {len(existing_data)})")
+    print(f"[OK] Updated leaderboard at {leaderboard_repo} (total rows: {existing_rows})")
 
     # Upload leaderboard dataset card
     # Extract username from repo name (format: "username/smoltrace-leaderboard")
@@ -439,6 +506,8 @@ def flatten_results_for_hf(
 ) -> List[Dict[str, Any]]:
     """Flattens the nested evaluation results into a list of dictionaries suitable for Hugging Face Dataset."""
     flat_results = []
+    # One timestamp per export: every row of this flattening shares it
+    evaluation_date = datetime.now().isoformat()
     for (
         _,
         results,
@@ -465,7 +534,7 @@ def flatten_results_for_hf(
 
             flat_row = {
                 "model": model_name,
-                "evaluation_date": datetime.now().isoformat(),
+                "evaluation_date": evaluation_date,
                 "task_id": res["test_id"],  # Renamed from test_id for UI consistency
                 "test_case_uid": test_case_uid,
                 "agent_type": res["agent_type"],
@@ -814,8 +883,9 @@ def save_results_locally(
     Returns:
         Path to the output directory
     """
-    # Create timestamped output directory
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Create timestamped output directory (the leaderboard row shares this time)
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     model_safe = model_name.replace("/", "_").replace(":", "_")
     dir_name = f"{model_safe}_{agent_type}_{timestamp}"
     full_output_dir = Path(output_dir) / dir_name
@@ -857,6 +927,7 @@ def save_results_locally(
         traces_dataset=f"local:{traces_path if trace_data else 'none'}",
         metrics_dataset=f"local:{metrics_path if metric_data else 'none'}",
         agent_type=agent_type,
+        evaluated_at=now,
     )
 
     leaderboard_path = full_output_dir / "leaderboard_row.json"
@@ -422,3 +422,38 @@ def test_cli_with_model_args(mock_run_evaluation_flow, mocker):
     # Check that model_args_dict was created and populated
     assert hasattr(args, "model_args_dict")
     assert args.model_args_dict == {"temperature": 0.7, "top_p": 0.9, "max_tokens": 2048}
+
+
+def test_cli_concurrency_alias_and_rate_limit(mock_run_evaluation_flow, mocker):
+    """Test --concurrency aliases --parallel-workers and --rate-limit is parsed."""
+    sys.argv = ["smoltrace-eval", "--model", "gpt-4", "--concurrency", "4", "--rate-limit", "2.5"]
+
+    main()
+
+    args = mock_run_evaluation_flow.call_args[0][0]
+    assert args.parallel_workers == 4
+    assert args.rate_limit == 2.5
+
+
+@pytest.mark.parametrize("rate", ["0", "-1.5", "nan", "fast"])
+def test_cli_rejects_non_positive_rate_limit(mock_run_evaluation_flow, capsys, rate):
+    """Test --rate-limit rejects zero, negative and non-numeric values at parse time."""
+    sys.argv = ["smoltrace-eval", "--model", "gpt-4", "--rate-limit", rate]
+
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == 2
+    assert "--rate-limit" in capsys.readouterr().err
+    mock_run_evaluation_flow.assert_not_called()
+
+
+def test_cli_dedupe_prompts_flag(mock_run_evaluation_flow, mocker):
+    """Test --dedupe-prompts is parsed and defaults to off."""
+    sys.argv = ["smoltrace-eval", "--model", "gpt-4"]
+    main()
+    assert mock_run_evaluation_flow.call_args[0][0].dedupe_prompts is False
+
+    sys.argv = ["smoltrace-eval", "--model", "gpt-4", "--dedupe-prompts"]
+    main()
+    assert mock_run_evaluation_flow.call_args[0][0].dedupe_prompts is True
@@ -68,6 +68,207 @@ def test_parallel_agent_tests_preserve_dataset_order(mocker):
     assert [result["test_id"] for result in results] == [f"task-{index}" for index in range(4)]
 
 
+def test_rate_limiter_spaces_test_starts(mocker):
+    from smoltrace.core import _RateLimiter
+
+    clock = {"now": 100.0}
+    mocker.patch("smoltrace.core.time.monotonic", side_effect=lambda: clock["now"])
+    sleeps = []
+    mocker.patch("smoltrace.core.time.sleep", side_effect=sleeps.append)
+
+    limiter = _RateLimiter(4)
+    for _ in range(3):
+        limiter.wait()
+
+    assert sleeps == [0.25, 0.5]
+
+
+def test_rate_limiter_rejects_non_positive_rate():
+    from smoltrace.core import _RateLimiter
+
+    with pytest.raises(ValueError, match="greater than 0"):
+        _RateLimiter(0)
+
+
+def test_run_in_background_returns_result_and_propagates_errors():
+    from smoltrace.core import _run_in_background
+
+    assert _run_in_background(lambda a, b=0: a + b, 1, b=2).result(timeout=5) == 3
+
+    def fail():
+        raise RuntimeError("download failed")
+
+    with pytest.raises(RuntimeError, match="download failed"):
+        _run_in_background(fail).result(timeout=5)
+
+    def exit_from_library():
+        raise SystemExit("library gave up")
+
+    # Not left RUNNING (which would block result() forever) by a non-Exception error
+    with pytest.raises(SystemExit, match="library gave up"):
+        _run_in_background(exit_from_library).result(timeout=5)
+
+
+@pytest.mark.parametrize("rate", [0, -1.0])
+def test_run_evaluation_rejects_non_positive_rate_limit_before_setup(mocker, rate):
+    from smoltrace.core import run_evaluation
+
+    load = mocker.patch("smoltrace.core.load_test_cases_from_hf", return_value=[])
+    setup_otel = mocker.patch("smoltrace.core.setup_inmemory_otel")
+
+    with pytest.raises(ValueError, match="greater than 0"):
+        run_evaluation(
+            "test-model", ["tool"], None, "tasks", "train", False, False, False, rate_limit=rate
+        )
+    load.assert_not_called()
+    setup_otel.assert_not_called()
+
+
+def test_run_evaluation_surfaces_dataset_load_errors(mocker):
+    from smoltrace.core import run_evaluation
+
+    mocker.patch(
+        "smoltrace.core.load_test_cases_from_hf", side_effect=RuntimeError("no such dataset")
+    )
+    init_model = mocker.patch("smoltrace.core._initialize_model", return_value=object())
+    run_tests = mocker.patch("smoltrace.core._run_agent_tests", return_value=[])
+    mocker.patch(
+        "smoltrace.core.setup_inmemory_otel",
+        return_value=(None, None, None, None, None, None),
+    )
+
+    with pytest.raises(RuntimeError, match="no such dataset"):
+        run_evaluation("test-model", ["tool"], None, "tasks", "train", False, False, False)
+    # The dataset failure surfaces before any model is loaded
+    init_model.assert_not_called()
+    run_tests.assert_not_called()
+
+
+def test_run_evaluation_applies_test_fallback_after_background_load(mocker, capsys):
+    from smoltrace.core import DEFAULT_CODE_TESTS, DEFAULT_TOOL_TESTS, run_evaluation
+
+    cause = ConnectionError("hub unreachable")
+    load = mocker.patch("smoltrace.core.load_dataset", side_effect=cause)
+    mocker.patch("smoltrace.core._initialize_model", return_value=object())
+    run_tests = mocker.patch("smoltrace.core._run_agent_tests", return_value=[])
+    mocker.patch(
+        "smoltrace.core.setup_inmemory_otel",
+        return_value=(None, None, None, None, None, None),
+    )
+
+    run_evaluation(
+        "test-model",
+        ["tool"],
+        None,
+        "org/tasks",
+        "train",
+        False,
+        False,
+        False,
+        allow_test_fallback=True,
+        dataset_revision="abc123",
+    )
+
+    load.assert_called_once()
+    assert run_tests.call_args.args[5] == DEFAULT_TOOL_TESTS + DEFAULT_CODE_TESTS
+    assert "Error loading dataset: hub unreachable" in capsys.readouterr().out
+
+
+def test_run_agent_tests_applies_rate_limiter(mocker):
+    from smoltrace.core import _run_agent_tests
+
+    mocker.patch("smoltrace.core.initialize_agent", return_value=Mock())
+    mocker.patch(
+        "smoltrace.core.evaluate_single_test",
+        side_effect=lambda agent, tc, *args, **kwargs: {"test_id": tc["id"], "success": True},
+    )
+    limiter = Mock()
+    test_cases = [
+        {"id": f"task-{index}", "agent_type": "tool", "difficulty": "easy"} for index in range(3)
+    ]
+
+    _run_agent_tests(
+        "tool",
+        "test-model",
+        "litellm",
+        None,
+        None,
+        test_cases,
+        None,
+        None,
+        False,
+        False,
+        rate_limiter=limiter,
+    )
+
+    assert limiter.wait.call_count == 3
+
+
+def test_run_agent_tests_dedupes_repeated_prompts(mocker):
+    from smoltrace.core import _run_agent_tests
+
+    mocker.patch("smoltrace.core.initialize_agent", return_value=Mock())
+    evaluate = mocker.patch(
+        "smoltrace.core.evaluate_single_test",
+        side_effect=lambda agent, tc, agent_type, *args, **kwargs: {
+            "test_id": tc["id"],
+            "test_case_uid": f"{agent_type}:{tc['id']}",
+            "difficulty": tc["difficulty"],
+            "prompt": tc["prompt"],
+            "success": True,
+            "tools_used": ["calculator"],
+            "trace_id": f"trace-{tc['id']}",
+            "span_id": f"span-{tc['id']}",
+        },
+    )
+    test_cases = [
+        {"id": "a", "agent_type": "tool", "difficulty": "easy", "prompt": "What is 2+2?"},
+        {"id": "a", "agent_type": "tool", "difficulty": "easy", "prompt": "What is 2+2?"},
+        {"id": "b", "agent_type": "both", "difficulty": "hard", "prompt": " What is  2+2? "},
+        {"id": "c", "agent_type": "tool", "difficulty": "easy", "prompt": "What is 2+3?"},
+        {
+            "id": "d",
+            "agent_type": "tool",
+            "difficulty": "easy",
+            "prompt": "What is 2+2?",
+            "expected_keywords": ["4"],
+        },
+    ]
+
+    results = _run_agent_tests(
+        "tool",
+        "test-model",
+        "litellm",
+        None,
+        None,
+        test_cases,
+        None,
+        None,
+        False,
+        False,
+        dedupe_prompts=True,
+    )
+
+    assert evaluate.call_count == 3
+    assert [r["test_id"] for r in results] == ["a", "a", "b", "c", "d"]
+    assert results[2]["reused_from"] == "tool:a"
+    assert results[2]["test_case_uid"] == "tool:b"
+    assert results[2]["difficulty"] == "hard"
+    assert results[2]["tools_used"] is not results[0]["tools_used"]
+    assert all("reused_from" not in results[i] for i in (0, 3, 4))
+
+    # A repeated id is a separate copy, so per-result fields do not alias
+    assert results[1] is not results[0]
+    assert results[1]["reused_from"] == "tool:a"
+    results[1]["test_index"] = 1
+    assert "test_index" not in results[0]
+
+    # Reused results carry no trace of their own
+    assert results[0]["trace_id"] == "trace-a"
+    assert all(results[i]["trace_id"] is None for i in (1, 2))
+    assert all(results[i]["span_id"] is None for i in (1, 2))
+
+
 def test_run_evaluation_reuses_model_across_agent_types(mocker):
     from smoltrace.core import run_evaluation
 
@@ -191,6 +392,23 @@ def test_initialize_agent_with_prompt_config(mocker):
     assert call_kwargs["max_steps"] == 3
 
 
+def test_initialize_agent_passes_max_tool_threads_to_tool_agent_only(mocker):
+    """Test max_tool_threads from prompt config reaches ToolCallingAgent but not CodeAgent."""
+    from smoltrace.core import initialize_agent
+
+    mocker.patch.dict("os.environ", {"OPENAI_API_KEY": "sk-test123"})
+    mocker.patch("smoltrace.core.LiteLLMModel")
+    tool_agent = mocker.patch("smoltrace.core.ToolCallingAgent")
+    code_agent = mocker.patch("smoltrace.core.CodeAgent")
+    prompt_config = {"max_tool_threads": 4}
+
+    initialize_agent("openai/gpt-4", "tool", provider="litellm", prompt_config=prompt_config)
+    initialize_agent("openai/gpt-4", "code", provider="litellm", prompt_config=prompt_config)
+
+    assert tool_agent.call_args[1]["max_tool_threads"] == 4
+    assert "max_tool_threads" not in code_agent.call_args[1]
+
+
 def test_initialize_agent_with_mcp_server(mocker):
     """Test agent initialization with MCP server."""
     from smoltrace.core import initialize_agent
@@ -275,6 +493,14 @@ def test_print_agent_summary(capsys):
     assert "66.7%" in captured.out
 
 
+def test_count_successes():
+    """Test success counting over result dicts."""
+    from smoltrace.core import count_successes
+
+    assert count_successes([{"success": True}, {"success": False}, {"success": True}]) == 2
+    assert count_successes([]) == 0
+
+
 def test_print_agent_summary_empty(capsys):
     """Test printing summary with no results."""
     from smoltrace.core import print_agent_summary
@@ -511,6 +737,39 @@ def test_is_final_answer_called_in_action_step_false():
     assert result is False
 
 
+def test_scan_action_step_single_pass():
+    """Test tools and final_answer detection come from a single scan."""
+    from smoltrace.core import scan_action_step
+
+    weather_call = Mock()
+    weather_call.name = "get_weather"
+    final_call = Mock()
+    final_call.name = "final_answer"
+    nameless_call = Mock(spec=[])
+
+    event = Mock()
+    event.tool_calls = [weather_call, nameless_call, final_call]
+    event.code = None
+
+    tools, final_called = scan_action_step(event, "tool", debug=False, tracer=None)
+
+    assert tools == ["get_weather"]
+    assert final_called is True
+
+
+def test_scan_action_step_without_tool_calls_attribute():
+    """Test events lacking tool_calls fall back to code inspection."""
+    from smoltrace.core import scan_action_step
+
+    event = Mock(spec=["code"])
+    event.code = "x = calculator('2+2')\nfinal_answer(x)"
+
+    tools, final_called = scan_action_step(event, "code", debug=False, tracer=None)
+
+    assert tools == ["calculator"]
+    assert final_called is True
+
+
 def test_evaluate_single_test_success_with_keywords(mocker):
     """Test that success is True when all conditions met including keyword check."""
     from smoltrace.core import evaluate_single_test
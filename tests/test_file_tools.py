@@ -1,5 +1,7 @@
 """Tests for file system tools (Phase 1)."""
 
+import builtins
+import os
 import tempfile
 from pathlib import Path
 
@@ -85,6 +87,28 @@ def test_read_file_directory(temp_workspace):
     assert "Error: Path is not a file" in result
 
 
+def test_read_file_stats_once(temp_workspace, mocker):
+    """Test existence, type and size checks share a single fstat() of the open file."""
+    tool = ReadFileTool(working_dir=str(temp_workspace))
+    stat_spy = mocker.spy(os, "stat")
+    fstat_spy = mocker.spy(os, "fstat")
+
+    result = tool.forward("file1.txt")
+
+    assert "Hello World" in result
+    assert stat_spy.call_count == 0
+    assert fstat_spy.call_count == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_read_file_rejects_fifo_without_blocking(temp_workspace):
+    """Test opening a named pipe doesn't wait for a writer."""
+    os.mkfifo(temp_workspace / "pipe")
+    tool = ReadFileTool(working_dir=str(temp_workspace))
+
+    assert "Error: Path is not a file" in tool.forward("pipe")
+
+
 def test_read_file_path_traversal(temp_workspace):
     """Test path traversal prevention."""
     tool = ReadFileTool(working_dir=str(temp_workspace))
@@ -118,6 +142,19 @@ def test_read_file_invalid_encoding(temp_workspace):
     assert "Error" in result or "Hello World" in result
 
 
+def test_read_file_binary_read_matches_text_mode(temp_workspace):
+    """Test newline translation and decode errors match a text-mode read."""
+    (temp_workspace / "crlf.txt").write_bytes(b"one\r\ntwo\rthree\n")
+    (temp_workspace / "bad.txt").write_bytes(b"\xff\xfe bad")
+    tool = ReadFileTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("crlf.txt")
+    assert result.endswith("\n\none\ntwo\nthree\n")
+    assert "Size: 15 bytes" in result
+
+    assert "Error: Failed to decode file with encoding 'utf-8'" in tool.forward("bad.txt")
+
+
 def test_read_file_size_limit(temp_workspace):
     """Test file size limit enforcement."""
     # Create a file larger than 10MB
@@ -131,6 +168,23 @@ def test_read_file_size_limit(temp_workspace):
     assert "Error: File too large" in result
 
 
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="requires posix_fadvise")
+def test_read_file_hints_sequential_readahead_for_large_files(temp_workspace, mocker):
+    """Test only large whole-file reads get the sequential readahead hint."""
+    (temp_workspace / "large.txt").write_text("y" * (2 * 1024 * 1024), encoding="utf-8")
+    tool = ReadFileTool(working_dir=str(temp_workspace))
+    fadvise_spy = mocker.spy(os, "posix_fadvise")
+
+    assert "Hello World" in tool.forward("file1.txt")
+    assert fadvise_spy.call_count == 0
+
+    result = tool.forward("large.txt")
+
+    assert result.endswith("y" * 100)
+    fadvise_spy.assert_called_once()
+    assert fadvise_spy.call_args.args[3] == os.POSIX_FADV_SEQUENTIAL
+
+
 # ============================================================================
 # WriteFileTool Tests
 # ============================================================================
@@ -195,6 +249,47 @@ def test_write_file_system_directory(temp_workspace):
     assert "Error: Access denied" in result or "system directory" in result
 
 
+def test_write_file_unencodable_content_leaves_file_intact(temp_workspace):
+    """Test encoding failures are reported before the target is truncated."""
+    tool = WriteFileTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("file1.txt", "bad \ud800 surrogate")
+
+    assert result.startswith("Error:")
+    assert (temp_workspace / "file1.txt").read_text(encoding="utf-8").startswith("Hello World")
+
+
+def test_write_file_symlink_targets_are_contained(temp_workspace):
+    """Test writes through symlinks are checked against the link target."""
+    with tempfile.TemporaryDirectory() as outside:
+        (temp_workspace / "escape.txt").symlink_to(Path(outside) / "stolen.txt")
+        (temp_workspace / "inner.txt").symlink_to(temp_workspace / "subdir" / "nested.txt")
+        tool = WriteFileTool(working_dir=str(temp_workspace))
+
+        result = tool.forward("escape.txt", "x")
+        assert "outside working directory" in result
+        assert not (Path(outside) / "stolen.txt").exists()
+
+        assert "Wrote file:" in tool.forward("inner.txt", "updated")
+        assert (temp_workspace / "subdir" / "nested.txt").read_text() == "updated"
+
+        assert "outside working directory" in tool.forward("subdir/../..", "x")
+
+
+def test_write_file_dangerous_paths_inside_workspace(temp_workspace):
+    """Test system-looking paths are refused unless allow_dangerous is set."""
+    (temp_workspace / "etc").mkdir()
+
+    result = WriteFileTool(working_dir=str(temp_workspace)).forward("etc/hosts", "x")
+    assert "Cannot write to system directory" in result
+    assert not (temp_workspace / "etc" / "hosts").exists()
+
+    result = WriteFileTool(working_dir=str(temp_workspace), allow_dangerous=True).forward(
+        "etc/hosts", "x"
+    )
+    assert "Wrote file:" in result
+
+
 def test_write_file_encoding(temp_workspace):
     """Test writing with UTF-8 encoding (default)."""
     tool = WriteFileTool(working_dir=str(temp_workspace))
@@ -219,6 +314,8 @@ def test_write_file_append_mode(temp_workspace):
     content = (temp_workspace / "append.txt").read_text()
     assert "Line 1" in content
     assert "Line 2" in content
+    # Reported size covers the whole file, not just the appended chunk
+    assert f"Size: {(temp_workspace / 'append.txt').stat().st_size} bytes" in result
 
 
 # ============================================================================
@@ -283,6 +380,19 @@ def test_list_directory_pattern(temp_workspace):
     assert "file2.json" not in result
 
 
+def test_list_directory_recursive_pattern_and_ordering(temp_workspace):
+    """Test multi-component patterns still glob and directories sort first."""
+    tool = ListDirectoryTool(working_dir=str(temp_workspace))
+
+    result = tool.forward(".", pattern="**/*.txt")
+    assert "nested.txt" in result
+    assert "file1.txt" in result
+
+    lines = tool.forward(".").splitlines()
+    assert lines[3] == "[DIR]  subdir/"
+    assert "[FILE] file1.txt (32 bytes)" in lines
+
+
 def test_list_directory_with_hidden_files(temp_workspace):
     """Test listing directory with hidden files."""
     # Create hidden file
@@ -357,6 +467,69 @@ def test_search_files_nested_directory(temp_workspace):
     assert "nested.txt" in result
 
 
+def test_search_files_content_counts_case_insensitive(temp_workspace):
+    """Test content search counts matches regardless of case, including non-ASCII."""
+    (temp_workspace / "subdir" / "notes.md").write_text(
+        "hello HELLO Hello\nCafé CAFÉ", encoding="utf-8"
+    )
+    (temp_workspace / "subdir" / "image.png").write_bytes(b"hello")
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+
+    result = tool.forward(".", "hello", search_type="content")
+    assert f"{Path('subdir') / 'notes.md'} (3 matches)" in result
+    assert "file1.txt (1 matches)" in result
+    assert "image.png" not in result
+
+    result = tool.forward(".", "café", search_type="content")
+    assert "notes.md (2 matches)" in result
+
+
+def test_search_files_content_prefilters_before_reading(temp_workspace, mocker):
+    """Test oversized and non-text files are skipped without being opened."""
+    (temp_workspace / "big.log").write_bytes(b"needle" + b"x" * (1024 * 1024))
+    (temp_workspace / "data.bin").write_bytes(b"needle")
+    (temp_workspace / "b").mkdir()
+    (temp_workspace / "a").mkdir()
+    (temp_workspace / "b" / "one.txt").write_text("needle", encoding="utf-8")
+    (temp_workspace / "a" / "two.txt").write_text("needle", encoding="utf-8")
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+    open_spy = mocker.spy(builtins, "open")
+
+    result = tool.forward(".", "needle", search_type="content")
+
+    opened = {Path(call.args[0]).name for call in open_spy.call_args_list}
+    assert {"one.txt", "two.txt"} <= opened
+    assert not opened & {"big.log", "data.bin"}
+    assert result.index(str(Path("a") / "two.txt")) < result.index(str(Path("b") / "one.txt"))
+
+
+def test_search_files_content_caseless_pattern(temp_workspace):
+    """Test patterns without letters are counted without case folding."""
+    (temp_workspace / "errors.log").write_text("GET 404\nPOST 404\nGET 200", encoding="utf-8")
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+
+    result = tool.forward(".", "404", search_type="content")
+
+    assert "errors.log (2 matches)" in result
+
+
+def test_search_files_by_name_matches_rglob(temp_workspace):
+    """Test the scandir-based name search finds the same entries as Path.rglob."""
+    (temp_workspace / "subdir" / "deeper").mkdir()
+    (temp_workspace / "subdir" / "deeper" / "leaf.txt").write_text("leaf", encoding="utf-8")
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+
+    for pattern in ("*.txt", "sub*", "subdir/*.txt"):
+        result = tool.forward(".", pattern, search_type="name")
+        lines = [line for line in result.splitlines()[2:] if line]
+        found = {line.split(" (")[0].split("/ [")[0] for line in lines}
+        expected = {str(p.relative_to(temp_workspace)) for p in temp_workspace.rglob(pattern)}
+        assert found == expected, pattern
+
+    result = tool.forward(".", "subdir", search_type="name")
+    assert "subdir/ [directory]" in result
+
+
 def test_search_files_path_traversal(temp_workspace):
     """Test path traversal prevention in search."""
     tool = FileSearchTool(working_dir=str(temp_workspace))
@@ -386,6 +559,45 @@ def test_search_files_max_results(temp_workspace):
     assert 48 <= match_count <= 52
 
 
+def test_search_files_content_max_results(temp_workspace):
+    """Test content search stops at max_results and keeps walk order across workers."""
+    for i in range(150):
+        (temp_workspace / f"match{i}.txt").write_text(f"target content {i}", encoding="utf-8")
+
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+
+    result = tool.forward(".", "TARGET", search_type="content", max_results=20)
+
+    assert "Found 20 results" in result
+    assert "Showing first 20 results" in result
+    assert result == tool.forward(".", "TARGET", search_type="content", max_results=20)
+
+
+def test_search_files_content_stops_walking_at_max_results(temp_workspace, mocker):
+    """Test content search only walks a bounded window past the last needed match."""
+    from smoltrace import tools
+
+    for i in range(500):
+        (temp_workspace / f"match{i:03d}.txt").write_text("target", encoding="utf-8")
+    walk = tools._walk_candidates
+    walked = []
+
+    def counting_walk(root):
+        for candidate in walk(root):
+            walked.append(candidate)
+            yield candidate
+
+    mocker.patch("smoltrace.tools._walk_candidates", side_effect=counting_walk)
+    tool = FileSearchTool(working_dir=str(temp_workspace))
+
+    result = tool.forward(".", "target", search_type="content", max_results=1)
+
+    assert "Found 1 results" in result
+    assert "match000.txt (1 matches)" in result
+    # Only the fixture files plus a window of 2 * workers (at most 64) are walked
+    assert len(walked) < 100
+
+
 def test_search_files_default_name_search(temp_workspace):
     """Test default search type is 'name'."""
     tool = FileSearchTool(working_dir=str(temp_workspace))
@@ -443,6 +655,96 @@ def test_file_tools_without_working_dir():
     assert tools[0].working_dir == Path.cwd()
 
 
+def test_file_tools_resolve_working_dir_once(temp_workspace, mocker):
+    """Test the working directory is resolved at construction, not on every call."""
+    tool = ReadFileTool(working_dir=str(temp_workspace))
+    assert tool._working_dir_resolved == temp_workspace.resolve()
+
+    resolve_spy = mocker.spy(os.path, "realpath")
+    result = tool.forward("file1.txt")
+
+    assert "Hello World" in result
+    # A link-free path below the cached working directory needs no realpath at all
+    assert resolve_spy.call_count == 0
+
+
+def test_validate_path_follows_symlinks_below_working_dir(temp_workspace):
+    """Test the lexical fast path still resolves symlinked components."""
+    with tempfile.TemporaryDirectory() as outside:
+        (Path(outside) / "secret.txt").write_text("secret", encoding="utf-8")
+        (temp_workspace / "escape").symlink_to(outside)
+        (temp_workspace / "inner").symlink_to(temp_workspace / "subdir")
+        tool = ReadFileTool(working_dir=str(temp_workspace))
+
+        with pytest.raises(ValueError, match="Access denied"):
+            tool._validate_path("escape/secret.txt")
+        with pytest.raises(ValueError, match="Access denied"):
+            tool._validate_path(str(temp_workspace / "escape" / "secret.txt"))
+        assert tool._validate_path("inner/nested.txt") == (
+            temp_workspace.resolve() / "subdir" / "nested.txt"
+        )
+        assert tool._validate_path("./subdir//missing/new.txt") == (
+            temp_workspace.resolve() / "subdir" / "missing" / "new.txt"
+        )
+
+
+def test_validate_path_rechecks_directory_swapped_for_symlink(temp_workspace):
+    """Test a path that validated once is rejected after a directory becomes an outside link."""
+    with tempfile.TemporaryDirectory() as outside:
+        (Path(outside) / "nested.txt").write_text("outside secret", encoding="utf-8")
+        tool = ReadFileTool(working_dir=str(temp_workspace))
+        assert "Nested file content" in tool.forward("subdir/nested.txt")
+
+        (temp_workspace / "subdir" / "nested.txt").unlink()
+        (temp_workspace / "subdir").rmdir()
+        (temp_workspace / "subdir").symlink_to(outside)
+
+        for reader in (tool, ReadFileTool(working_dir=str(temp_workspace))):
+            result = reader.forward("subdir/nested.txt")
+            assert "Access denied" in result
+            assert "outside secret" not in result
+
+
+def test_validate_path_rechecks_missing_component_created_as_symlink(temp_workspace):
+    """Test a path through a missing directory is re-checked once that directory is a link."""
+    with tempfile.TemporaryDirectory() as outside:
+        tool = ReadFileTool(working_dir=str(temp_workspace))
+        assert tool._validate_path("later/file.txt") == temp_workspace.resolve() / "later/file.txt"
+
+        (temp_workspace / "later").symlink_to(outside)
+
+        with pytest.raises(ValueError, match="Access denied"):
+            tool._validate_path("later/file.txt")
+
+
+def test_validate_path_rejects_sibling_with_common_prefix(tmp_path):
+    """Test a sibling directory whose name extends the working directory's is rejected."""
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    (tmp_path / "ws2").mkdir()
+    tool = ReadFileTool(working_dir=str(workspace))
+
+    assert tool._validate_path(".") == workspace.resolve()
+    with pytest.raises(ValueError, match="Access denied"):
+        tool._validate_path("../ws2/secret.txt")
+    with pytest.raises(ValueError, match="Access denied"):
+        tool._validate_path(str(tmp_path / "ws2"))
+
+
+def test_working_dir_resolution_is_shared_across_tools(temp_workspace, mocker):
+    """Test tools built on the same directory share its resolution, not their path checks."""
+    ReadFileTool(working_dir=str(temp_workspace))
+
+    resolve_spy = mocker.spy(os.path, "realpath")
+    lstat_spy = mocker.spy(os, "lstat")
+    result = ListDirectoryTool(working_dir=str(temp_workspace)).forward("subdir")
+
+    assert "nested.txt" in result
+    # The working directory isn't resolved again, but the path itself is re-checked
+    assert resolve_spy.call_count == 0
+    assert lstat_spy.call_count >= 1
+
+
 def test_file_tool_attributes():
     """Test file tools have correct attributes."""
     read_tool = ReadFileTool()
@@ -72,6 +72,59 @@ def test_inmemory_span_exporter_with_parent_span():
     assert spans[0]["parent_span_id"] == hex(11111)
 
 
+def test_inmemory_span_exporter_status_kind_and_duration():
+    """Test status code names, kind prefix stripping and duration from a single export."""
+    from smoltrace.otel import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+
+    mock_span = Mock()
+    mock_span.get_span_context().trace_id = 1
+    mock_span.get_span_context().span_id = 2
+    mock_span.parent = None
+    mock_span.name = "errored_span"
+    mock_span.start_time = 1_000_000
+    mock_span.end_time = 4_000_000
+    mock_span.attributes = {"llm.token_count.total": 42}
+    mock_span.events = []
+    mock_span.status = Mock(status_code=Mock(value=2), description="boom")
+    mock_span.kind = "SpanKind.CLIENT"
+    mock_span.resource = None
+
+    exporter.export([mock_span])
+    span = exporter.get_finished_spans()[0]
+    assert span["status"] == {"code": "ERROR", "description": "boom"}
+    assert span["kind"] == "CLIENT"
+    assert span["duration_ms"] == 3.0
+    assert span["total_tokens"] == 42
+    assert span["attributes"] == {"llm.token_count.total": 42}
+    assert span["resource"] == {}
+
+
+def test_inmemory_span_exporter_converts_shared_resource_once(mocker):
+    """Test that resource attributes are converted once per Resource, not per span."""
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    from smoltrace import otel
+
+    convert = mocker.spy(otel, "_safe_attrs_to_dict")
+    exporter = otel.InMemorySpanExporter()
+    provider = TracerProvider(resource=Resource.create({"service.name": "svc"}))
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer(__name__)
+
+    for i in range(3):
+        with tracer.start_as_current_span(f"span_{i}"):
+            pass
+
+    spans = exporter.get_finished_spans()
+    assert all(s["resource"]["attributes"]["service.name"] == "svc" for s in spans)
+    resource_calls = [c for c in convert.call_args_list if "service.name" in dict(c.args[0])]
+    assert len(resource_calls) == 1
+
+
 def test_inmemory_span_exporter_with_token_attributes():
     """Test span with LLM token attributes."""
     from smoltrace.otel import InMemorySpanExporter
@@ -346,6 +399,7 @@ def test_trace_metrics_aggregator_collect_all_with_data():
             "spans": [
                 {
                     "span_id": "span_1",
+                    "name": "test_evaluation",
                     "attributes": {
                         "test.id": "test_1",
                         "tests.tool_calls": "2",
@@ -370,6 +424,53 @@ def test_trace_metrics_aggregator_collect_all_with_data():
     assert any(m["name"] == "gen_ai.co2.emissions" for m in metrics)
 
 
+def test_trace_metrics_aggregator_sums_test_spans_and_skips_bad_values():
+    """Test that only test spans are counted and unparsable counters count as zero."""
+    from smoltrace.otel import TraceMetricsAggregator
+
+    trace_data = [
+        {
+            "total_tokens": 100,
+            "total_cost_usd": 0.25,
+            "spans": [
+                {
+                    "name": "test_evaluation",
+                    "attributes": {"test.id": "t1", "tests.tool_calls": "2", "tests.steps": 3},
+                },
+                {
+                    "name": "test_evaluation",
+                    "attributes": {"test.id": "t2", "tests.tool_calls": "n/a"},
+                },
+                {"name": "llm_call", "attributes": {"llm.token_count.total": 10}},
+                {"name": "tool_call", "attributes": {"test.id": "t1", "tests.steps": 100}},
+                {"name": "test_evaluation"},
+                {},
+            ],
+        },
+        {
+            "total_tokens": 50,
+            "spans": [
+                {"name": "test_evaluation", "attributes": {"test.id": "t3", "tests.steps": "4"}}
+            ],
+        },
+    ]
+    all_results = {
+        "tool": [{"test_id": "t1", "success": True}, {"test_id": "t2", "success": False}],
+        "code": [{"test_id": "t3", "success": True}],
+    }
+
+    metrics = {
+        m["name"]: m["data_points"][0]
+        for m in TraceMetricsAggregator().collect_all(trace_data, all_results)
+    }
+
+    assert metrics["tests.successful"]["value"]["value"] == 2
+    assert metrics["tests.successful"]["attributes"]["total_tests"] == 3
+    assert metrics["tests.tool_calls"]["value"]["sum"] == 2
+    assert metrics["tests.steps"]["value"]["sum"] == 7
+    assert metrics["llm.token_count.total"]["value"]["value"] == 150
+
+
 def test_trace_metrics_aggregator_with_exception():
     """Test aggregator handles exceptions gracefully."""
     from smoltrace.otel import TraceMetricsAggregator
@@ -387,6 +488,21 @@ def test_trace_metrics_aggregator_with_exception():
     assert result == []  # Should return empty on exception
 
 
+def test_trace_metrics_aggregator_traceback_only_in_debug(capsys):
+    """Test that aggregation failures print a stack trace only in debug mode."""
+    from smoltrace.otel import TraceMetricsAggregator
+
+    trace_data = [{"spans": "invalid"}]
+
+    TraceMetricsAggregator().collect_all(trace_data=trace_data, all_results={})
+    captured = capsys.readouterr()
+    assert "Traceback" not in captured.err
+    assert "rerun with --debug" in captured.out
+
+    TraceMetricsAggregator().collect_all(trace_data=trace_data, all_results={}, debug=True)
+    assert "Traceback" in capsys.readouterr().err
+
+
 def test_trace_metrics_aggregator_flatten_attributes_dict():
     """Test flattening attributes when already a dict."""
     from smoltrace.otel import TraceMetricsAggregator
@@ -541,3 +657,33 @@ def test_span_attributes_preserve_numbers_and_redact_environment_values(monkeypa
     assert attributes["count"] == 7
     assert marker_value not in attributes["output.value"]
     assert "[REDACTED]" in attributes["output.value"]
+
+
+def test_trace_metrics_aggregator_success_map_tracks_result_changes():
+    """Test that the success lookup reflects appended and updated results."""
+    from smoltrace.otel import TraceMetricsAggregator
+
+    aggregator = TraceMetricsAggregator()
+    all_results = {"tool": [{"test_id": "t1", "success": True}]}
+    assert aggregator._get_success_map(all_results) == {"t1": True}
+
+    all_results["tool"].append({"test_id": "t2", "success": False})
+    assert aggregator._get_success_map(all_results) == {"t1": True, "t2": False}
+
+    # An in-place update keeps the dict identity and result counts unchanged
+    all_results["tool"][1]["success"] = True
+    assert aggregator._get_success_map(all_results) == {"t1": True, "t2": True}
+    assert aggregator._get_success_map({"code": []}) == {}
+
+
+def test_importing_otel_does_not_load_evaluation_stack():
+    """Test that smoltrace.otel imports without pulling in datasets/smolagents."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, smoltrace.otel; "
+        "print(any(m in sys.modules for m in ('datasets', 'smolagents', 'smoltrace.core')))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
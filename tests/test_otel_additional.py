@@ -1,5 +1,7 @@
 """Additional tests for smoltrace.otel module to increase coverage."""
 
+import pytest
+
 
 def test_inmemory_span_exporter_with_mapping_attributes():
     """Test span exporter with Mapping-type attributes (lines 106-107)."""
@@ -161,3 +163,157 @@ def test_inmemory_span_exporter_resource_attributes_empty():
     # Should have handled missing/empty resource gracefully
     for span in spans:
         assert "resource" in span
+
+
+def test_inmemory_span_exporter_spool_to_disk_round_trips_spans():
+    """Test that spooled spans are kept out of memory and read back intact."""
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    from smoltrace.otel import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter(spool_to_disk=True)
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer(__name__)
+
+    with tracer.start_as_current_span("parent"):
+        with tracer.start_as_current_span("child") as span:
+            span.set_attribute("tests.steps", 3)
+
+    assert exporter._spans == []
+    spans = exporter.get_finished_spans()
+    assert [s["name"] for s in spans] == ["child", "parent"]
+    assert spans[0]["attributes"]["tests.steps"] == 3
+    assert spans[0]["parent_span_id"] == spans[1]["span_id"]
+    # Reading does not consume the spool
+    assert len(exporter.get_finished_spans()) == 2
+
+    exporter.shutdown()
+    assert exporter._spool is None
+    # Spans that were still spooled survive shutdown
+    assert [s["name"] for s in exporter.get_finished_spans()] == ["child", "parent"]
+
+
+def test_spool_spans_enabled_reads_env(monkeypatch):
+    """Test SMOLTRACE_SPOOL_SPANS enables the disk-backed span exporter."""
+    from smoltrace.otel import _spool_spans_enabled
+
+    monkeypatch.delenv("SMOLTRACE_SPOOL_SPANS", raising=False)
+    assert _spool_spans_enabled() is False
+    monkeypatch.setenv("SMOLTRACE_SPOOL_SPANS", "true")
+    assert _spool_spans_enabled() is True
+
+
+def test_span_spool_serialization_falls_back_to_stdlib_json(monkeypatch):
+    """Test spool (de)serialization with and without orjson installed."""
+    from smoltrace import otel
+
+    span = {"name": "s", "attributes": {"tests.steps": 3, "big": 2**70}, "start_time": 1}
+    assert otel._loads_span(otel._dumps_span(span)) == span
+
+    monkeypatch.setattr(otel, "orjson", None)
+    encoded = otel._dumps_span(span)
+    assert isinstance(encoded, bytes)
+    assert otel._loads_span(encoded) == span
+
+
+def test_span_spool_reads_back_non_finite_floats_from_fallback():
+    """Test that a stdlib-written NaN line still loads when orjson is installed."""
+    import math
+
+    from smoltrace import otel
+
+    if otel.orjson is None:
+        pytest.skip("orjson not installed")
+
+    # 2**70 makes orjson reject the span, so it is written by the stdlib fallback
+    encoded = otel._dumps_span({"attributes": {"big": 2**70, "ratio": float("nan")}})
+    assert b"NaN" in encoded
+    loaded = otel._loads_span(encoded)
+    assert loaded["attributes"]["big"] == 2**70
+    assert math.isnan(loaded["attributes"]["ratio"])
+
+
+def test_inmemory_span_exporter_flushes_attached_batch_processor():
+    """Test that queued spans are drained from a batching processor on read."""
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from smoltrace.otel import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    processor = BatchSpanProcessor(exporter, schedule_delay_millis=60_000)
+    exporter.attach_processor(processor)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer(__name__)
+
+    for i in range(3):
+        with tracer.start_as_current_span(f"span_{i}"):
+            pass
+
+    assert sorted(s["name"] for s in exporter.get_finished_spans()) == [
+        "span_0",
+        "span_1",
+        "span_2",
+    ]
+    provider.shutdown()
+
+
+def test_inmemory_span_exporter_warns_when_batch_queue_drops_spans(caplog):
+    """Test that spans dropped by a full export queue are reported on read."""
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from smoltrace.otel import InMemorySpanExporter, _CountingBatchSpanProcessor
+
+    exporter = InMemorySpanExporter()
+    processor = _CountingBatchSpanProcessor(
+        exporter, max_queue_size=2, max_export_batch_size=2, schedule_delay_millis=60_000
+    )
+    exporter.attach_processor(processor)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer(__name__)
+
+    for i in range(5):
+        with tracer.start_as_current_span(f"span_{i}"):
+            pass
+
+    with caplog.at_level("WARNING", logger="smoltrace.otel"):
+        spans = exporter.get_finished_spans()
+    assert processor.queued_spans == 5
+    dropped = 5 - len(spans)
+    assert dropped > 0
+    assert f"{dropped} span(s) were dropped" in caplog.text
+
+    # The same drops are not reported again on a later read
+    caplog.clear()
+    with caplog.at_level("WARNING", logger="smoltrace.otel"):
+        exporter.get_finished_spans()
+    assert "dropped" not in caplog.text
+    provider.shutdown()
+
+
+def test_inmemory_span_exporter_warns_when_flush_fails(caplog):
+    """Test that a processor flush that does not complete is reported."""
+    from unittest.mock import Mock
+
+    from smoltrace.otel import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    exporter.attach_processor(Mock(spec=["force_flush"], force_flush=Mock(return_value=False)))
+
+    with caplog.at_level("WARNING", logger="smoltrace.otel"):
+        assert exporter.get_finished_spans() == []
+    assert "did not finish flushing" in caplog.text
+
+
+def test_inmemory_span_exporter_spool_ignores_empty_batches():
+    """Test that an empty export batch does not write a blank spool line."""
+    from smoltrace.otel import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter(spool_to_disk=True)
+    exporter.export([])
+    assert exporter.get_finished_spans() == []
+    exporter.shutdown()
@@ -172,6 +172,23 @@ def test_kill_protected_pid():
     )
 
 
+@pytest.mark.skipif(
+    not hasattr(sys.modules.get("psutil", None), "Process"), reason="psutil not installed"
+)
+@patch("psutil.Process")
+@patch("psutil.pid_exists")
+def test_kill_protected_name_is_case_insensitive(mock_pid_exists, mock_process):
+    """Test protected process names are matched regardless of case."""
+    tool = KillTool()
+    mock_pid_exists.return_value = True
+    mock_process.return_value.name.return_value = "SYSTEMD"
+
+    result = tool.forward(pid=4242)
+
+    assert "Error: Cannot kill protected system process: SYSTEMD" in result
+    mock_process.return_value.terminate.assert_not_called()
+
+
 @pytest.mark.skipif(
     not hasattr(sys.modules.get("psutil", None), "Process"), reason="psutil not installed"
 )
@@ -1,5 +1,6 @@
 """Tests for Phase 2 text processing tools (grep, sed, sort, head_tail)."""
 
+import os
 import tempfile
 from pathlib import Path
 
@@ -81,6 +82,37 @@ def test_grep_with_context(temp_workspace):
     assert "Line 5" in result  # Context after
 
 
+def test_grep_context_groups_and_separators(temp_workspace):
+    """Test overlapping context merges, gaps get '--', and matches keep the ':' marker."""
+    tool = GrepTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("sample.txt", "Hello", context_after=1)
+    assert result.splitlines()[1:] == [
+        "1:Line 1: Hello World",
+        "2-Line 2: Python Programming",
+        "3:Line 3: Hello Again",
+        "4-Line 4: Data Science",
+        "5:Line 5: Hello Python",
+    ]
+
+    result = tool.forward("log.txt", "ERROR", line_numbers=False)
+    assert result.splitlines()[1:] == [
+        "2025-01-15 10:01:00 ERROR: Connection failed",
+        "--",
+        "2025-01-15 10:03:00 ERROR: Connection failed",
+    ]
+
+
+def test_grep_context_when_every_line_matches(temp_workspace):
+    """Test wide context on an all-matching file emits each line once, in order."""
+    (temp_workspace / "all.txt").write_text("".join(f"x{i}\n" for i in range(2000)))
+    tool = GrepTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("all.txt", "x", context_before=500, context_after=500)
+
+    assert result.splitlines()[1:] == [f"{i + 1}:x{i}" for i in range(2000)]
+
+
 def test_grep_invert_match(temp_workspace):
     """Test grep with inverted matching."""
     tool = GrepTool(working_dir=str(temp_workspace))
@@ -101,6 +133,245 @@ def test_grep_count_only(temp_workspace):
     assert "3 matches" in result
 
 
+def test_grep_count_only_inverted(temp_workspace):
+    """Test count_only honours invert_match and per-line anchors."""
+    tool = GrepTool(working_dir=str(temp_workspace))
+
+    assert "2 matches" in tool.forward("sample.txt", "Hello", invert_match=True, count_only=True)
+    assert "5 matches" in tool.forward("sample.txt", "^Line", count_only=True)
+
+
+def test_grep_literal_search_matches_regex_results(temp_workspace, mocker):
+    """Test the chunked str.find path gives the regex path's output, across chunk edges."""
+    from smoltrace import tools
+
+    mocker.patch.object(tools._iter_literal_matches, "__defaults__", (16,))
+    lines = [f"{i} {'needle needle' if i % 3 == 0 else 'hay'}" for i in range(60)]
+    (temp_workspace / "stack.txt").write_text("\n".join(lines), encoding="utf-8")
+    tool = GrepTool(working_dir=str(temp_workspace))
+    find_spy = mocker.spy(tools, "_iter_literal_matches")
+
+    literal = tool.forward("stack.txt", "needle")
+    count = tool.forward("stack.txt", "needle", count_only=True)
+    assert find_spy.call_count == 2
+
+    regex = tool.forward("stack.txt", "need[l]e")
+    assert literal.split("\n", 1)[1] == regex.split("\n", 1)[1]
+    assert literal.endswith("\n--\n55:54 needle needle\n--\n58:57 needle needle")
+    assert count == "20 matches in stack.txt"
+    assert tool.forward("stack.txt", "hay", line_numbers=False).splitlines()[1:3] == [
+        "1 hay",
+        "2 hay",
+    ]
+
+
+def test_grep_count_only_hyperscan_backend(temp_workspace, mocker):
+    """Test the Hyperscan count path agrees with re, and unsupported patterns fall back."""
+    import re
+    from types import SimpleNamespace
+
+    from smoltrace import tools
+
+    class FakeDatabase:
+        """Stand-in for hyperscan.Database reporting every match end like block mode."""
+
+        def compile(self, expressions, flags):
+            if b"(?=" in expressions[0]:
+                raise fake.error("lookahead not supported")
+            ignore_case = re.IGNORECASE if flags[0] & fake.HS_FLAG_CASELESS else 0
+            self.regex = re.compile(expressions[0], re.MULTILINE | ignore_case)
+
+        def scan(self, data, match_event_handler):
+            for match in self.regex.finditer(data):
+                match_event_handler(0, match.start(), match.end(), 0, None)
+
+    fake = SimpleNamespace(
+        Database=FakeDatabase,
+        error=type("error", (Exception,), {}),
+        HS_FLAG_CASELESS=1,
+        HS_FLAG_MULTILINE=2,
+        HS_FLAG_UTF8=4,
+        HS_FLAG_UCP=8,
+    )
+    (temp_workspace / "spans.txt").write_text("a\nb\nab\nb\n", encoding="utf-8")
+    tool = GrepTool(working_dir=str(temp_workspace))
+    cases = [
+        ("sample.txt", "l+o", {}),
+        ("sample.txt", "hello", {"case_insensitive": True}),
+        ("sample.txt", "Hello", {"invert_match": True}),
+        ("log.txt", "ERROR|INFO", {}),
+        ("spans.txt", r"a\sb", {}),
+        ("spans.txt", "b$", {}),
+        ("sample.txt", "Line(?= 3)", {}),
+    ]
+    expected = [tool.forward(name, pattern, count_only=True, **kw) for name, pattern, kw in cases]
+
+    mocker.patch.object(tools, "hyperscan", fake)
+    tools._hyperscan_database.cache_clear()
+    tools._TEXT_RESULTS.clear()
+    scan_spy = mocker.spy(FakeDatabase, "scan")
+
+    assert [tool.forward(name, pattern, count_only=True, **kw) for name, pattern, kw in cases] == (
+        expected
+    )
+    assert scan_spy.call_count == len(cases) - 1
+    tools._hyperscan_database.cache_clear()
+
+
+def test_grep_count_only_real_hyperscan_matches_re(temp_workspace, mocker):
+    """Test the real Hyperscan engine gives the same counts as the re path."""
+    hyperscan = pytest.importorskip("hyperscan")
+    from smoltrace import tools
+
+    (temp_workspace / "spans.txt").write_text("a\nb\nab\nb\ncafé\nCAFÉ\n", encoding="utf-8")
+    tool = GrepTool(working_dir=str(temp_workspace))
+    cases = [
+        ("sample.txt", "l+o", {}),
+        ("sample.txt", "hello", {"case_insensitive": True}),
+        ("sample.txt", "Hello", {"invert_match": True}),
+        ("log.txt", "ERROR|INFO", {}),
+        ("spans.txt", r"a\sb", {}),
+        ("spans.txt", "b$", {}),
+        ("spans.txt", "café", {"case_insensitive": True}),
+        ("sample.txt", "Line(?= 3)", {}),
+    ]
+
+    mocker.patch.object(tools, "hyperscan", hyperscan)
+    tools._hyperscan_database.cache_clear()
+    tools._TEXT_RESULTS.clear()
+    accelerated = [
+        tool.forward(name, pattern, count_only=True, **kw) for name, pattern, kw in cases
+    ]
+    # Every pattern but the lookahead compiles to a Hyperscan database
+    compiled = [
+        tools._hyperscan_database(pattern, bool(kw.get("case_insensitive")))
+        for _, pattern, kw in cases
+    ]
+    assert [db is not None for db in compiled] == [True] * (len(cases) - 1) + [False]
+
+    mocker.patch.object(tools, "hyperscan", None)
+    tools._TEXT_RESULTS.clear()
+    assert accelerated == [
+        tool.forward(name, pattern, count_only=True, **kw) for name, pattern, kw in cases
+    ]
+    tools._hyperscan_database.cache_clear()
+
+
+def test_grep_and_sed_share_compiled_patterns(temp_workspace, mocker):
+    """Test a pattern compiled by one tool is reused by the next call."""
+    from smoltrace import tools
+
+    tools._compile_regex.cache_clear()
+    compile_spy = mocker.spy(tools.re, "compile")
+
+    GrepTool(working_dir=str(temp_workspace)).forward("log.txt", "ERROR")
+    SedTool(working_dir=str(temp_workspace)).forward("log.txt", "/ERROR/d")
+    GrepTool(working_dir=str(temp_workspace)).forward("sample.txt", "ERROR")
+
+    assert compile_spy.call_count == 1
+    assert tools._compile_regex.cache_info().hits == 2
+
+
+def test_text_tools_handle_mixed_encoding(temp_workspace):
+    """Test undecodable bytes are replaced in output and preserved in written files."""
+    (temp_workspace / "mixed.log").write_bytes(b"b caf\xe9 ERROR\na ok\n")
+
+    grep = GrepTool(working_dir=str(temp_workspace)).forward("mixed.log", "ERROR")
+    assert "1:b caf\ufffd ERROR" in grep
+    head = HeadTailTool(working_dir=str(temp_workspace)).forward("mixed.log", lines=1)
+    assert head.endswith("b caf\ufffd ERROR\n")
+
+    sed = SedTool(working_dir=str(temp_workspace))
+    assert "Lines: 2" in sed.forward("mixed.log", "s/ok/OK/", output_file="sed.log")
+    assert (temp_workspace / "sed.log").read_bytes() == b"b caf\xe9 ERROR\na OK\n"
+
+    sort = SortTool(working_dir=str(temp_workspace))
+    assert "Sorted 2 lines" in sort.forward("mixed.log", output_file="sorted.log")
+    assert (temp_workspace / "sorted.log").read_bytes() == b"a ok\nb caf\xe9 ERROR\n"
+
+
+def test_text_tool_results_are_cached_until_the_file_changes(temp_workspace, mocker):
+    """Test repeated calls on an unchanged file are served from the result cache."""
+    from smoltrace import tools
+
+    tools._TEXT_RESULTS.clear()
+    grep = GrepTool(working_dir=str(temp_workspace))
+    sed = SedTool(working_dir=str(temp_workspace))
+    head = HeadTailTool(working_dir=str(temp_workspace))
+    first = [
+        grep.forward("log.txt", "ERROR"),
+        sed.forward("log.txt", "s/ERROR/E/"),
+        head.forward("log.txt", lines=2),
+    ]
+    grep_spy = mocker.spy(tools, "_compile_regex")
+
+    assert grep.forward("log.txt", "ERROR") == first[0]
+    assert sed.forward("log.txt", "s/ERROR/E/") == first[1]
+    assert head.forward("log.txt", lines=2) == first[2]
+    assert grep_spy.call_count == 0
+
+    # Different arguments, and any change to the file, are misses
+    assert grep.forward("log.txt", "ERROR", line_numbers=False) != first[0]
+    (temp_workspace / "log.txt").write_text("ERROR: only line\n", encoding="utf-8")
+    assert grep.forward("log.txt", "ERROR") == (
+        "Matches in log.txt (pattern: 'ERROR'):\n1:ERROR: only line"
+    )
+    assert grep_spy.call_count == 2
+
+    # Errors and calls that write an output file always run
+    for _ in range(2):
+        grep.forward("log.txt", "[bad")
+        sed.forward("log.txt", "s/only/sole/", output_file="out.txt")
+    assert grep_spy.call_count == 4
+    assert (temp_workspace / "out.txt").read_text(encoding="utf-8") == "ERROR: sole line\n"
+
+
+def test_cached_text_results_revalidate_the_path(temp_workspace):
+    """Test a cached result isn't served once its directory is swapped for an outside link."""
+    from smoltrace import tools
+
+    tools._TEXT_RESULTS.clear()
+    (temp_workspace / "sub").mkdir()
+    (temp_workspace / "sub" / "app.log").write_text("ERROR: inside\n", encoding="utf-8")
+    grep = GrepTool(working_dir=str(temp_workspace))
+    assert "ERROR: inside" in grep.forward("sub/app.log", "ERROR")
+
+    with tempfile.TemporaryDirectory() as outside:
+        # Same file moved out of the workspace: its identity, and so its cache key, is unchanged
+        os.rename(temp_workspace / "sub" / "app.log", Path(outside) / "app.log")
+        (temp_workspace / "sub").rmdir()
+        (temp_workspace / "sub").symlink_to(outside)
+
+        result = grep.forward("sub/app.log", "ERROR")
+
+    assert "Access denied" in result
+    assert "ERROR: inside" not in result
+
+
+def test_result_cache_evicts_least_recently_used():
+    """Test the result cache honours both its entry and its size budget."""
+    from functools import partial
+
+    from smoltrace.tools import _ResultCache
+
+    cache = _ResultCache(max_entries=2, max_chars=10)
+    st = os.stat(__file__)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    for value in ["aaa", "bbb", "aaa", "ccc", "aaa", "bbb"]:
+        assert cache.get_or_compute(st, partial(compute, value)) == value
+    assert calls == ["aaa", "bbb", "ccc", "bbb"]
+
+    cache.get_or_compute(st, partial(compute, "x" * 8))
+    assert calls[-1] == "x" * 8
+    cache.get_or_compute(st, partial(compute, "aaa"))
+    assert calls[-1] == "aaa"
+
+
 def test_grep_no_matches(temp_workspace):
     """Test grep with no matches."""
     tool = GrepTool(working_dir=str(temp_workspace))
@@ -173,6 +444,52 @@ def test_sed_case_insensitive(temp_workspace):
     assert "Hi World" in result
 
 
+def test_sed_literal_substitution_skips_regex(temp_workspace, mocker):
+    """Test literal substitutions match the regex results without compiling a pattern."""
+    from smoltrace import tools
+
+    tool = SedTool(working_dir=str(temp_workspace))
+    tools._compile_regex.cache_clear()
+    compile_spy = mocker.spy(tools.re, "compile")
+
+    first = tool.forward("sample.txt", "s/l/L/")
+    every = tool.forward("sample.txt", "s/l/L/", global_replace=True)
+
+    assert compile_spy.call_count == 0
+    assert "Line 1: HeLlo World" in first
+    assert "Line 1: HeLLo WorLd" in every
+    assert first == tool.forward("sample.txt", "s/[l]/L/")
+    assert every == tool.forward("sample.txt", "s/[l]/L/", global_replace=True)
+    assert "Line.1: Hello World" in tool.forward("sample.txt", "s/ /./")
+
+
+def test_sed_global_substitution_keeps_line_semantics(temp_workspace):
+    """Test whole-file global substitutions give the same result as line-by-line ones."""
+    import re
+
+    lines = ["ab \n", "cd\n", "x\n"]
+    (temp_workspace / "words.txt").write_text("".join(lines), encoding="utf-8")
+    tool = SedTool(working_dir=str(temp_workspace))
+
+    # Plain patterns, then matches that would cross a newline, anchors, word
+    # boundaries and empty matches at line ends
+    for pattern, replacement in [
+        (r"\w+", r"<\g<0>>"),
+        ("c", "C"),
+        (r"\s+", "_"),
+        ("$", ";"),
+        ("x*", "-"),
+        (r"d\b", "D"),
+    ]:
+        result = tool.forward("words.txt", f"s/{pattern}/{replacement}/", global_replace=True)
+        expected = "".join(re.sub(pattern, replacement, line) for line in lines)
+        assert result == f"Transformation result:\n{expected}"
+
+    result = tool.forward("words.txt", "s/ //", global_replace=True, output_file="words.txt")
+    assert "Lines: 3" in result
+    assert (temp_workspace / "words.txt").read_text(encoding="utf-8") == "ab\ncd\nx\n"
+
+
 def test_sed_deletion(temp_workspace):
     """Test sed deletion command."""
     tool = SedTool(working_dir=str(temp_workspace))
@@ -205,6 +522,33 @@ def test_sed_output_to_file(temp_workspace):
     assert (temp_workspace / "output.txt").exists()
 
 
+def test_sed_in_place_and_streamed_output(temp_workspace):
+    """Test writing back to the input file keeps its content, and line counts are reported."""
+    tool = SedTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("log.txt", "/INFO/d", output_file="log.txt")
+    assert "Lines: 2" in result
+    assert (temp_workspace / "log.txt").read_text(encoding="utf-8") == (
+        "2025-01-15 10:01:00 ERROR: Connection failed\n"
+        "2025-01-15 10:03:00 ERROR: Connection failed\n"
+    )
+
+    result = tool.forward("sample.txt", "s/l/L/", global_replace=True, output_file="out/s.txt")
+    assert "Lines: 5" in result
+    assert (
+        (temp_workspace / "out" / "s.txt")
+        .read_text(encoding="utf-8")
+        .startswith("Line 1: HeLLo WorLd\n")
+    )
+
+
+def test_sed_print_line_out_of_range(temp_workspace):
+    """Test printing a missing line reports the file's line count."""
+    tool = SedTool(working_dir=str(temp_workspace))
+
+    assert "Error: Line 9 out of range (file has 5 lines)" in tool.forward("sample.txt", "9p")
+
+
 def test_sed_invalid_command(temp_workspace):
     """Test sed with invalid command."""
     tool = SedTool(working_dir=str(temp_workspace))
@@ -245,6 +589,18 @@ def test_sort_numeric(temp_workspace):
     assert lines[4] == "20"
 
 
+def test_sort_numeric_mixed_lines(temp_workspace):
+    """Test numeric sort handles indentation, signs, decimals and non-numeric lines."""
+    (temp_workspace / "mixed.txt").write_text(
+        "  7 seven\n-2.5 minus\nabc\n10\n3.25\n", encoding="utf-8"
+    )
+    tool = SortTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("mixed.txt", numeric=True)
+
+    assert result.split("\n")[1:-1] == ["-2.5 minus", "abc", "3.25", "  7 seven", "10"]
+
+
 def test_sort_reverse(temp_workspace):
     """Test reverse sort."""
     tool = SortTool(working_dir=str(temp_workspace))
@@ -267,6 +623,59 @@ def test_sort_unique(temp_workspace):
     assert result.count("banana") == 1
 
 
+def test_sort_unique_keeps_first_occurrence(temp_workspace):
+    """Test unique keeps first occurrences, which a stable numeric sort preserves."""
+    (temp_workspace / "dups.txt").write_text("1 b\n1 a\nApple\n1 b\napple\n", encoding="utf-8")
+    tool = SortTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("dups.txt", numeric=True, unique=True)
+    assert result.split("\n")[1:-1] == ["Apple", "apple", "1 b", "1 a"]
+
+    result = tool.forward("dups.txt", numeric=True, unique=True, case_insensitive=True)
+    assert "(3 unique)" in result
+    assert result.split("\n")[1:-1] == ["Apple", "1 b", "1 a"]
+
+
+def test_sort_splits_only_on_newlines(temp_workspace):
+    """Test lines are split on newlines only, with blank lines kept and CRLF handled."""
+    (temp_workspace / "odd.txt").write_bytes("b\x0cx\r\n\r\na\u2028y\r\nc".encode("utf-8"))
+    tool = SortTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("odd.txt")
+
+    assert result.startswith("Sorted 4 lines:\n")
+    assert result.split("\n")[1:-1] == ["", "a\u2028y", "b\x0cx", "c"]
+
+
+def test_sort_large_file_merges_sorted_runs(temp_workspace, mocker):
+    """Test the out-of-core sort writes exactly what the in-memory sort would."""
+    import random
+
+    from smoltrace import tools
+
+    rng = random.Random(7)
+    words = ["b", "B", "a\t", "a", "10 x", "9", " 2", "-1", "c c"]
+    (temp_workspace / "big.txt").write_text(
+        "\n".join(rng.choice(words) for _ in range(300)), encoding="utf-8"
+    )
+    tool = SortTool(working_dir=str(temp_workspace))
+    options = [{}, {"reverse": True}, {"numeric": True}, {"case_insensitive": True}]
+    expected = []
+    for i, kwargs in enumerate(options):
+        tool.forward("big.txt", output_file=f"mem{i}.txt", **kwargs)
+        expected.append((temp_workspace / f"mem{i}.txt").read_text(encoding="utf-8"))
+
+    mocker.patch.object(tools, "_SORT_IN_MEMORY_MAX_BYTES", 100)
+    mocker.patch.object(tools, "_SORT_CHUNK_BYTES", 64)
+    sort_spy = mocker.spy(tools, "_external_sort")
+
+    for i, kwargs in enumerate(options):
+        result = tool.forward("big.txt", output_file=f"ext{i}.txt", **kwargs)
+        assert result == f"Sorted 300 lines. Output written to: ext{i}.txt"
+        assert (temp_workspace / f"ext{i}.txt").read_text(encoding="utf-8") == expected[i]
+    assert sort_spy.call_count == len(options)
+
+
 def test_sort_case_insensitive(temp_workspace):
     """Test case-insensitive sort."""
     (temp_workspace / "mixed_case.txt").write_text("Zebra\napple\nBanana\n", encoding="utf-8")
@@ -342,6 +751,62 @@ def test_tail_custom_lines(temp_workspace):
     assert "Line 1" not in result
 
 
+@pytest.mark.parametrize("newline", ["\r\n", "\r", "\n"])
+@pytest.mark.parametrize("slurp_bytes", [0, 256 * 1024])
+def test_tail_reads_backwards_across_chunks(temp_workspace, mocker, slurp_bytes, newline):
+    """Test tail stitches chunks correctly and still reports the total line count.
+
+    Small files are read whole instead; both strategies must agree, and both
+    split lines like text-mode readlines() does, including on a lone \\r.
+    """
+    mocker.patch("smoltrace.tools._TAIL_CHUNK_SIZE", 7)
+    mocker.patch("smoltrace.tools._HEAD_TAIL_SLURP_BYTES", slurp_bytes)
+    content = "".join(f"línea {i}{newline}" for i in range(1, 51)) + "última"
+    (temp_workspace / "long.txt").write_bytes(content.encode("utf-8"))
+    tool = HeadTailTool(working_dir=str(temp_workspace))
+
+    result = tool.forward("long.txt", mode="tail", lines=3)
+
+    assert result == ("Last 3 lines of long.txt (total: 51 lines):\nlínea 49\nlínea 50\núltima")
+    assert tool.forward("long.txt", lines=2) == (
+        "First 2 lines of long.txt (total: 51 lines):\nlínea 1\nlínea 2\n"
+    )
+
+
+def test_count_lines_matches_readlines_across_read_boundary(tmp_path):
+    """Test a \\r\\n split across read chunks is counted as one line break."""
+    from smoltrace.tools import _count_lines
+
+    path = tmp_path / "mixed.txt"
+    path.write_bytes(b"a" * (1024 * 1024 - 1) + b"\r\nb\rc\n\rd")
+
+    with open(path, encoding="utf-8") as f:
+        expected = len(f.readlines())
+    assert expected == 5
+    assert _count_lines(path) == expected
+
+
+def test_text_tools_stat_input_once(temp_workspace, mocker):
+    """Test each text tool checks its input file with a single stat() call."""
+    from smoltrace import tools
+
+    calls = [
+        (GrepTool, {"pattern": "Hello"}),
+        (SedTool, {"command": "s/Hello/Hi/"}),
+        (SortTool, {}),
+        (HeadTailTool, {"mode": "tail"}),
+    ]
+    for tool_class, kwargs in calls:
+        tool = tool_class(working_dir=str(temp_workspace))
+        stat_spy = mocker.spy(tools.os, "stat")
+
+        assert not tool.forward("sample.txt", **kwargs).startswith("Error")
+        assert stat_spy.call_count == 1
+        mocker.stop(stat_spy)
+
+    assert SortTool(working_dir=str(temp_workspace)).forward(".") == "Error: Path is not a file: ."
+
+
 def test_head_tail_invalid_mode(temp_workspace):
     """Test invalid mode."""
     tool = HeadTailTool(working_dir=str(temp_workspace))
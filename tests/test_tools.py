@@ -61,6 +61,15 @@ def test_weather_tool_unknown_location():
     assert "Clear" in result
 
 
+def test_weather_tool_reuses_cached_report():
+    """Test repeated lookups for a location return the cached report."""
+    tool = WeatherTool()
+
+    first = tool.forward("Lisbon, Portugal")
+    assert tool.forward("Lisbon, Portugal") is first
+    assert WeatherTool().forward("Lisbon, Portugal") is first
+
+
 def test_calculator_tool_basic_operations():
     """Test CalculatorTool with basic math operations."""
     tool = CalculatorTool()
@@ -113,6 +122,20 @@ def test_calculator_tool_error_handling():
     assert "Error calculating" in result
 
 
+def test_calculator_tool_caches_repeated_expressions():
+    """Test CalculatorTool reuses results for repeated expressions but not errors."""
+    tool = CalculatorTool()
+    CalculatorTool._calculate.cache_clear()
+
+    assert tool.forward("6 * 7") == "Result: 42"
+    assert tool.forward("6 * 7") == "Result: 42"
+    assert CalculatorTool._calculate.cache_info().hits == 1
+
+    assert "Error calculating" in tool.forward("1 / 0")
+    assert "Error calculating" in tool.forward("1 / 0")
+    assert CalculatorTool._calculate.cache_info().currsize == 1
+
+
 def test_time_tool_default_timezone():
     """Test TimeTool with default UTC timezone."""
     tool = TimeTool()
@@ -140,6 +163,38 @@ def test_time_tool_with_timezone():
     assert "Current time in PST" in result
 
 
+def test_time_tool_matches_strftime_format(mocker):
+    """Test TimeTool's hand-built timestamp matches the strftime format."""
+    from datetime import datetime
+
+    fixed = datetime(2024, 3, 7, 9, 5, 2)
+    mocker.patch("smoltrace.tools.time.time", return_value=fixed.timestamp() + 0.25)
+
+    result = TimeTool().forward("UTC")
+    assert result == f"Current time in UTC: {fixed.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+def test_time_tool_formats_once_per_second(mocker):
+    """Test calls within the same second reuse the formatted timestamp."""
+    from datetime import datetime
+
+    base = datetime(2024, 3, 7, 9, 5, 2).timestamp()
+    mocker.patch("smoltrace.tools._timestamp_cache", (-1, ""))
+    clock = mocker.patch("smoltrace.tools.time.time", return_value=base)
+    mock_datetime = mocker.patch("smoltrace.tools.datetime", wraps=datetime)
+    fromtimestamp = mock_datetime.fromtimestamp
+    tool = TimeTool()
+
+    first = tool.forward("UTC")
+    clock.return_value = base + 0.9
+    assert tool.forward("UTC") == first
+    assert fromtimestamp.call_count == 1
+
+    clock.return_value = base + 1
+    assert tool.forward("UTC").endswith("09:05:03")
+    assert fromtimestamp.call_count == 2
+
+
 def test_initialize_mcp_tools_success(mocker, capsys):
     """Test initialize_mcp_tools function with successful connection."""
     from unittest.mock import MagicMock, Mock, patch
@@ -300,6 +355,17 @@ def test_initialize_mcp_tools_connection_error(mocker, capsys):
         assert "Connection failed" in captured.out
 
 
+def test_get_all_tools_reuses_default_tool_instances():
+    """The stateless default tools are built once; each call gets a fresh list."""
+    first = get_all_tools()
+    second = get_all_tools()
+
+    assert first is not second
+    assert all(a is b for a, b in zip(first, second))
+    first.append(object())
+    assert len(get_all_tools()) == 3
+
+
 def test_get_all_tools_default():
     """Network and code-execution tools are not enabled by default."""
     tools = get_all_tools()
@@ -429,3 +495,15 @@ def test_time_tool_attributes():
     assert hasattr(tool, "inputs")
     assert hasattr(tool, "output_type")
     assert tool.output_type == "string"
+
+
+def test_tools_are_reexported_from_package():
+    """Test that the package re-exports the single canonical tool definitions."""
+    import smoltrace
+    from smoltrace import tools
+
+    assert smoltrace.WeatherTool is tools.WeatherTool
+    assert smoltrace.CalculatorTool is tools.CalculatorTool
+    assert smoltrace.TimeTool is tools.TimeTool
+    assert smoltrace.get_all_tools is tools.get_all_tools
+    assert smoltrace.initialize_mcp_tools is tools.initialize_mcp_tools
@@ -280,3 +280,26 @@ def test_flatten_falls_back_to_enhanced_trace_info():
     assert row["trace_id"] == "trace_legacy"
     assert row["span_id"] == "span_legacy"
     assert row["test_case_uid"] == "tool:t1"
+
+
+def test_test_span_omits_prompt_by_default(monkeypatch):
+    monkeypatch.delenv("SMOLTRACE_SPAN_INCLUDE_PROMPT", raising=False)
+    spans = []
+    evaluate_single_test(
+        _StubAgent(), dict(SHARED_TEST_CASE), "tool", tracer=_make_tracer(spans), verbose=False
+    )
+
+    attributes = spans[0]["attributes"]
+    assert "prompt" not in attributes
+    assert attributes["test.id"] == SHARED_TEST_CASE["id"]
+    assert attributes["test.case_uid"] == "tool:shared_basic_weather"
+
+
+def test_test_span_includes_prompt_when_opted_in(monkeypatch):
+    monkeypatch.setenv("SMOLTRACE_SPAN_INCLUDE_PROMPT", "true")
+    spans = []
+    evaluate_single_test(
+        _StubAgent(), dict(SHARED_TEST_CASE), "tool", tracer=_make_tracer(spans), verbose=False
+    )
+
+    assert spans[0]["attributes"]["prompt"] == SHARED_TEST_CASE["prompt"]
@@ -1,9 +1,15 @@
 """Additional tests for smoltrace.utils module."""
 
+import json
 import os
 import tempfile
+from datetime import datetime
 from unittest.mock import Mock
 
+import pytest
+from datasets import Dataset
+
+from smoltrace import utils
 from smoltrace.utils import (
     aggregate_gpu_metrics,
     compute_leaderboard_row,
@@ -18,6 +24,14 @@ from smoltrace.utils import (
 
 
 # Tests for get_hf_user_info
+@pytest.fixture(autouse=True)
+def clear_whoami_cache():
+    """Keep whoami answers cached by one test from leaking into the next."""
+    utils._whoami_user_info.cache_clear()
+    yield
+    utils._whoami_user_info.cache_clear()
+
+
 def test_get_hf_user_info_success(mocker):
     """Test successful HF user info fetch."""
     mock_api = mocker.patch("smoltrace.utils.HfApi")
@@ -68,6 +82,42 @@ def test_get_hf_user_info_request_error(mocker):
     assert result is None
 
 
+def test_get_hf_user_info_caches_successes_only(mocker):
+    """Test whoami runs once per token, while failures are retried."""
+    mock_api = mocker.patch("smoltrace.utils.HfApi")
+    whoami = mock_api.return_value.whoami
+    whoami.side_effect = [ValueError("Hub unavailable"), {"name": "test_user", "type": "user"}]
+
+    assert get_hf_user_info("test_token") is None
+    first = get_hf_user_info("test_token")
+    first["username"] = "changed"
+    second = get_hf_user_info("test_token")
+
+    assert second["username"] == "test_user"
+    assert whoami.call_count == 2
+
+
+def test_compute_leaderboard_row_uses_given_evaluation_time():
+    """Test the row's timestamp and notes come from one shared evaluation time."""
+    evaluated_at = datetime(2024, 1, 2, 3, 4, 5)
+
+    row = compute_leaderboard_row(
+        "test-model",
+        {"tool": [{"success": True, "steps": 1}]},
+        [],
+        {},
+        "tasks",
+        "results",
+        "traces",
+        "metrics",
+        submitted_by="tester",
+        evaluated_at=evaluated_at,
+    )
+
+    assert row["timestamp"] == "2024-01-02T03:04:05"
+    assert row["notes"].startswith("Evaluation on 2024-01-02;")
+
+
 # Tests for generate_dataset_names
 def test_generate_dataset_names():
     """Test dataset name generation."""
@@ -254,6 +304,35 @@ def test_flatten_results_for_hf():
     assert flattened[0]["task_id"] == "t1"
     assert flattened[1]["task_id"] == "t2"
     assert flattened[2]["task_id"] == "c1"
+    # One flattening is one export: every row carries the same evaluation date
+    assert len({r["evaluation_date"] for r in flattened}) == 1
+
+
+def test_flatten_results_for_hf_serializes_trace_info_with_json_dumps():
+    """Test enhanced_trace_info is stored exactly as json.dumps writes it."""
+    info = {"trace_id": "0xabc", "prompt": "Café ☕", "cost": float("nan")}
+    result = {
+        "test_id": "t1",
+        "agent_type": "tool",
+        "success": True,
+        "difficulty": "easy",
+        "prompt": "p",
+        "tool_called": True,
+        "correct_tool": True,
+        "final_answer_called": True,
+        "tools_used": [],
+        "steps": 1,
+        "response": "r",
+        "enhanced_trace_info": info,
+    }
+
+    flattened = flatten_results_for_hf({"tool": [result]}, "test-model")
+    assert flattened[0]["enhanced_trace_info"] == json.dumps(info)
+
+    # Values json cannot encode still raise instead of being stringified
+    result["enhanced_trace_info"] = {"when": object()}
+    with pytest.raises(TypeError):
+        flatten_results_for_hf({"tool": [result]}, "test-model")
 
 
 def test_flatten_results_for_hf_empty():
@@ -281,26 +360,45 @@ def test_update_leaderboard_new(mocker):
 
 
 def test_update_leaderboard_append(mocker):
-    """Test updating existing leaderboard."""
-    mock_load = mocker.patch("smoltrace.utils.load_dataset")
-    mock_ds = Mock()
-    mock_ds.__iter__ = Mock(return_value=iter([{"model": "old-model", "agent_type": "code"}]))
-    mock_load.return_value = mock_ds
-
-    mock_ds_instance = Mock()
-    mock_build = mocker.patch(
-        "smoltrace.utils._build_leaderboard_dataset", return_value=mock_ds_instance
-    )
+    """Test updating existing leaderboard keeps the stored rows in Arrow."""
+    existing = Dataset.from_list([{"model": "old-model", "agent_type": "code"}])
+    mocker.patch("smoltrace.utils.load_dataset", return_value=existing)
+    mocker.patch("smoltrace.utils.upload_dataset_card", return_value=True)
+    mock_push = mocker.patch.object(Dataset, "push_to_hub", autospec=True)
+    build_spy = mocker.spy(utils, "_build_leaderboard_dataset")
 
     new_row = {"model": "new-model", "agent_type": "tool", "success_rate": 96.0}
 
     update_leaderboard("test/leaderboard", new_row, "test_token")
 
-    # Should append to existing data
-    existing_data, appended_row = mock_build.call_args[0]
-    assert len(existing_data) == 1
-    assert existing_data[0]["model"] == "old-model"
-    assert appended_row["model"] == "new-model"
+    # Should append to existing data without rebuilding it row by row
+    build_spy.assert_not_called()
+    pushed, repo = mock_push.call_args.args
+    assert repo == "test/leaderboard"
+    assert pushed["model"] == ["old-model", "new-model"]
+    assert pushed["success_rate"] == [None, 96.0]
+
+
+def test_append_leaderboard_row_matches_full_rebuild():
+    """Test the Arrow append produces the same dataset as the union-schema rebuild."""
+    old_rows = [
+        {"model": "old-model", "total_tests": 1, "success_rate": 50.0, "team": "core"},
+        {"model": "older-model", "total_tests": 2, "success_rate": 75.0, "team": None},
+    ]
+    existing = utils._build_leaderboard_dataset(old_rows[:1], old_rows[1])
+    rows = [
+        # New column, int into a float column, missing stored column
+        {"model": "new-model", "total_tests": 3, "success_rate": 96, "extra": "x"},
+        # Float into an int column: the stored schema can't hold it, so rebuild
+        {"model": "float-model", "total_tests": 4.5, "success_rate": 80.0},
+    ]
+
+    for new_row in rows:
+        appended = utils._append_leaderboard_row(existing, new_row)
+        rebuilt = utils._build_leaderboard_dataset([dict(row) for row in existing], new_row)
+
+        assert appended.features == rebuilt.features
+        assert appended.to_list() == rebuilt.to_list()
 
 
 def test_update_leaderboard_no_repo():
@@ -422,6 +520,16 @@ def test_save_results_locally():
         assert "traces.json" in files
         assert "metrics.json" in files
 
+        # Files are indented JSON, and the row shares the directory's timestamp
+        with open(os.path.join(output_path, "traces.json"), encoding="utf-8") as f:
+            assert f.read() == json.dumps(trace_data, indent=2)
+        with open(os.path.join(output_path, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        with open(os.path.join(output_path, "leaderboard_row.json"), encoding="utf-8") as f:
+            row = json.load(f)
+        evaluated_at = datetime.fromisoformat(row["timestamp"])
+        assert evaluated_at.strftime("%Y%m%d_%H%M%S") == metadata["timestamp"]
+
 
 def test_save_results_locally_with_flatten(mocker):
     """Test saving results with flattening."""
@@ -496,6 +604,36 @@ def test_aggregate_gpu_metrics_with_sum_type():
     assert result["power_avg"] == 275.0
 
 
+def test_aggregate_gpu_metrics_ignores_unreported_metrics():
+    """Test metrics outside the report are skipped, even with unparseable values."""
+    resource_metrics = [
+        {
+            "scopeMetrics": [
+                {
+                    "metrics": [
+                        {
+                            "name": "gen_ai.client.token.usage",
+                            "sum": {"dataPoints": [{"asInt": "not-a-number"}]},
+                        },
+                        {"name": "gen_ai.gpu.utilization", "histogram": {"dataPoints": []}},
+                        {
+                            "name": "gen_ai.gpu.utilization",
+                            "gauge": {"dataPoints": [{"asInt": "40"}, {"asInt": 0}, {}]},
+                        },
+                    ]
+                }
+            ]
+        }
+    ]
+
+    result = aggregate_gpu_metrics(resource_metrics)
+
+    # A falsy asInt without asDouble and an empty data point carry no value
+    assert result["utilization_avg"] == 40
+    assert result["utilization_max"] == 40
+    assert result["memory_avg"] is None
+
+
 def test_compute_leaderboard_row_with_invalid_tokens():
     """Test compute_leaderboard_row with invalid token values (lines 155-156)."""
     model_name = "test-model"